@@ -1,64 +1,42 @@
 import streamlit as st
 
-from streamlit_plugins.components.theme_changer import st_theme_changer
-from streamlit_plugins.components.theme_changer.entity import ThemeInfo, ThemeInput, ThemeBaseLight, ThemeBaseDark
-
-PROTECTED_THEMES = ['garden_light', 'garden_dark']
-CUSTOM_THEME_KEY = 'custom_theme_key'
-DEFAULT_INIT_THEME = 'garden_dark'
-
-garden_light_theme = ThemeInput(
-    name="Garden Oasis (Light)",
-    icon="🌿", 
-    order=1,
-    themeInfo=ThemeInfo(
-        base=ThemeBaseLight.base, primaryColor="#388E3C", backgroundColor="#F9FFF5", 
-        secondaryBackgroundColor="#E8F5E9", textColor="#000000", widgetBackgroundColor="#FFFFFF",
-        widgetBorderColor="#81C784", skeletonBackgroundColor="#C8E6C9", bodyFont=ThemeBaseLight.bodyFont,
-        codeFont=ThemeBaseLight.codeFont, fontFaces=ThemeBaseLight.fontFaces
-    )
-)
-
-garden_dark_theme = ThemeInput(
-    name="Midnight Flora (Dark)",
-    icon="🌙", 
-    order=2,
-    themeInfo=ThemeInfo(
-        base=ThemeBaseDark.base, primaryColor="#8BC34A", backgroundColor="#1C301C", 
-        secondaryBackgroundColor="#2E482E", textColor="#E8F5E9", widgetBackgroundColor="#3A573A", 
-        widgetBorderColor="#A5D6A7", skeletonBackgroundColor="#556B55", bodyFont=ThemeBaseDark.bodyFont,
-        codeFont=ThemeBaseDark.codeFont, fontFaces=ThemeBaseDark.fontFaces
-    )
-)
+import instrumentation
+import themes
+from settings import MIRROR_HOST, MIRROR_PORT
+from themes import CUSTOM_THEME_KEY, DEFAULT_INIT_THEME
 
-custom_theme = ThemeInput(
-    name="Custom Theme",
-    icon="🖌️", 
-    order=3,
-    themeInfo=ThemeInfo(
-        base=ThemeBaseDark.base, primaryColor="#FF5722", backgroundColor="#212121", 
-        secondaryBackgroundColor="#3A3A3A", textColor="#FFFFFF", widgetBackgroundColor="#424242", 
-        widgetBorderColor="#FF9800", skeletonBackgroundColor="#4E4E4E", bodyFont=ThemeBaseDark.bodyFont,
-        codeFont=ThemeBaseDark.codeFont, fontFaces=ThemeBaseDark.fontFaces
-    )
-)
+from streamlit_plugins.components.theme_changer import st_theme_changer
 
-init_theme_data = {
-    'garden_light': garden_light_theme,
-    'garden_dark': garden_dark_theme,
-    CUSTOM_THEME_KEY: custom_theme,
-}
+# Served by Streamlit's static file serving (see .streamlit/config.toml), so
+# the browser fetches and caches the file instead of it going through the
+# session's media storage
+MUSIC_URL = "/app/static/GAG.mp3"
 
 def _init_session_state():
-    if "theme_data" not in st.session_state:
-        st.session_state["theme_data"] = init_theme_data
+    # Only the fields this session changed are kept; the themes themselves
+    # are shared. A saved custom theme comes back from the URL.
+    if "theme_overrides" not in st.session_state:
+        st.session_state["theme_overrides"] = themes.decode_overrides(st.query_params.get(themes.THEME_QUERY_PARAM))
 
     if "music_on" not in st.session_state:
         st.session_state["music_on"] = False
 
+    if "compact_mode" not in st.session_state:
+        st.session_state["compact_mode"] = False
+
 _init_session_state()
 
-theme_data = st.session_state["theme_data"]
+
+@st.cache_resource(show_spinner=False)
+def _start_poller():
+    # Start the background stock refresher once per server process. Imported
+    # here and called after the page is drawn, so the first visitor doesn't
+    # wait for the stock modules, the history database and the mirror.
+    import poller
+
+    poller.start()
+
+theme_data = themes.theme_data(st.session_state["theme_overrides"])
 
 st_theme_changer(
     themes_data=theme_data, 
@@ -108,16 +86,21 @@ def open_settings_dialog():
             new_code_font = f2.text_input("Code Font", value=current_theme.themeInfo.codeFont)
 
             if st.form_submit_button("💾 Save Changes and Apply"):
-                theme_data[CUSTOM_THEME_KEY].themeInfo.primaryColor = new_primary
-                theme_data[CUSTOM_THEME_KEY].themeInfo.textColor = new_text
-                theme_data[CUSTOM_THEME_KEY].themeInfo.backgroundColor = new_bg
-                theme_data[CUSTOM_THEME_KEY].themeInfo.secondaryBackgroundColor = new_sec_bg
-                theme_data[CUSTOM_THEME_KEY].themeInfo.widgetBackgroundColor = new_widget_bg
-                theme_data[CUSTOM_THEME_KEY].themeInfo.widgetBorderColor = new_widget_border
-                theme_data[CUSTOM_THEME_KEY].themeInfo.bodyFont = new_body_font
-                theme_data[CUSTOM_THEME_KEY].themeInfo.codeFont = new_code_font
-                
-                st.session_state["theme_data"] = theme_data
+                overrides = themes.make_overrides({
+                    "primaryColor": new_primary,
+                    "textColor": new_text,
+                    "backgroundColor": new_bg,
+                    "secondaryBackgroundColor": new_sec_bg,
+                    "widgetBackgroundColor": new_widget_bg,
+                    "widgetBorderColor": new_widget_border,
+                    "bodyFont": new_body_font,
+                    "codeFont": new_code_font,
+                })
+                st.session_state["theme_overrides"] = overrides
+                if overrides:
+                    st.query_params[themes.THEME_QUERY_PARAM] = themes.encode_overrides(overrides)
+                else:
+                    st.query_params.pop(themes.THEME_QUERY_PARAM, None)
                 
                 st.session_state["theme_init_active_theme"] = CUSTOM_THEME_KEY 
                 
@@ -132,6 +115,57 @@ def open_settings_dialog():
     
     music_status = st.toggle("Enable Background Music", value=st.session_state["music_on"], key="dialog_music_toggle")
     st.session_state["music_on"] = music_status
+
+    compact_status = st.toggle(
+        "Compact stock tables",
+        value=st.session_state["compact_mode"],
+        key="dialog_compact_toggle",
+        help="Show each stock category as one table instead of a row of widgets per item. Faster with large stocks.",
+    )
+    st.session_state["compact_mode"] = compact_status
+
+    st.markdown("---")
+
+    with st.expander("📊 Diagnostics"):
+        import normalize
+        import stock_api
+
+        cache = stock_api.cache_stats()
+        d1, d2, d3 = st.columns(3)
+        d1.metric("Stock cache hit rate", f"{cache['hit_rate']:.0%}")
+        d2.metric("Upstream calls", cache["upstream_calls"])
+        d3.metric("Schema errors", normalize.stats["schema_errors"])
+        if cache["shared_cache"]:
+            versions = ", ".join(f"{endpoint} v{version}" for endpoint, version in sorted(cache["shared_versions"].items()))
+            st.caption(f"Shared cache: {cache['shared_cache']}, {cache['shared_hits']} hits. Snapshot versions: {versions or 'none yet'}")
+
+        timings = instrumentation.summary()
+        if timings:
+            st.dataframe(
+                [
+                    {
+                        "Span": t.name,
+                        "Where": ", ".join(str(value) for value in t.labels.values()),
+                        "Count": t.count,
+                        "p50 (ms)": t.p50 * 1000,
+                        "p95 (ms)": t.p95 * 1000,
+                        "p99 (ms)": t.p99 * 1000,
+                    }
+                    for t in timings
+                ],
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    "p50 (ms)": st.column_config.NumberColumn(format="%.1f"),
+                    "p95 (ms)": st.column_config.NumberColumn(format="%.1f"),
+                    "p99 (ms)": st.column_config.NumberColumn(format="%.1f"),
+                },
+            )
+            st.caption("Timings cover every session on this server, percentiles over the latest samples.")
+        else:
+            st.caption("No timings recorded yet.")
+        if MIRROR_PORT:
+            st.caption(f"Prometheus metrics: http://{MIRROR_HOST}:{MIRROR_PORT}/metrics")
     
     if st.button("Close Settings"):
         st.rerun()
@@ -158,8 +192,14 @@ st.markdown(
     - **⚙️ Gear Stock:** Info on the current gear in stock.
     - **✨ Cosmetic Sock:** Info on the current cosmetics in stock.
     - **🌥️ Weather and Mutations:** Info on the current weather and mutations that can be applied to your plants.
+    - **📦 All Stock:** Every shop category on a single page.
+    - **📜 Stock History:** When items were last in stock and how often they restock.
+    - **🧮 Profit Calculator:** Estimated fruit value and return on seed cost for every crop and mutation stack.
+    - **🔔 Watchlist:** Get an alert when a watched item comes into stock.
     """
 )
 
 if st.session_state.get("music_on", False):
-    st.audio("../GAG.mp3", loop=True, autoplay=True)
+    st.audio(MUSIC_URL, loop=True, autoplay=True)
+
+_start_poller()
@@ -0,0 +1,127 @@
+from collections import namedtuple
+
+import numpy as np
+
+import crops
+from rarity import SEED_RARITY
+
+# Crop value and ROI over NumPy arrays. The catalog is turned into arrays once
+# at import (TABLE) and shared by every session, so each calculation is a few
+# broadcasted array operations over seeds x mutations x weathers instead of
+# nested loops. Arrays in a Table are read-only; functions return new arrays.
+#
+# A fruit is worth
+#
+#   base_value * growth * (1 + sum(mutation - 1)) * (weight / base_weight) ** 2
+#
+# where growth is the Gold/Rainbow multiplier (or 1) and the sum runs over its
+# environmental mutations.
+
+# Chance given to mutations of a live weather that crops.py doesn't list
+DEFAULT_CHANCE = 0.1
+
+Table = namedtuple("Table", ["seeds", "costs", "values", "mutations", "bonuses", "index", "weathers", "chances"])
+
+
+def _frozen(array):
+    array.setflags(write=False)
+    return array
+
+
+def build_table(crop_values, seed_costs, mutations, weather_mutations):
+    # crop_values {name: (value, weight)}, seed_costs {name: cost},
+    # mutations {name: multiplier}, weather_mutations {weather: {mutation: chance}}
+    seeds = tuple(name for name in crop_values if seed_costs.get(name))
+    names = tuple(mutations)
+    index = {name.lower(): i for i, name in enumerate(names)}
+    weathers = tuple(weather_mutations)
+
+    chances = np.zeros((len(weathers), len(names)))
+    for w, weather in enumerate(weathers):
+        for mutation, chance in weather_mutations[weather].items():
+            i = index.get(mutation.lower())
+            if i is not None:
+                chances[w, i] = chance
+
+    return Table(
+        seeds=seeds,
+        costs=_frozen(np.array([seed_costs[name] for name in seeds], dtype=float)),
+        values=_frozen(np.array([crop_values[name][0] for name in seeds], dtype=float)),
+        mutations=names,
+        bonuses=_frozen(np.array([mutations[name] - 1 for name in names], dtype=float)),
+        index=index,
+        weathers=weathers,
+        chances=_frozen(chances),
+    )
+
+
+TABLE = build_table(
+    crops.CROP_VALUES,
+    {name: cost for name, (_, _, cost) in SEED_RARITY.items()},
+    crops.MUTATIONS,
+    crops.WEATHER_MUTATIONS,
+)
+
+
+def growth_multiplier(gold=0.0, rainbow=0.0):
+    # Expected growth multiplier for the given Gold/Rainbow chances (0-1).
+    # Works on scalars or arrays.
+    gold_bonus = crops.GROWTH_MUTATIONS["Gold"] - 1
+    rainbow_bonus = crops.GROWTH_MUTATIONS["Rainbow"] - 1
+    return 1 + np.asarray(gold) * gold_bonus + np.asarray(rainbow) * rainbow_bonus
+
+
+def mutation_vector(names, table=TABLE):
+    # 0/1 row over table.mutations. Unknown names are ignored.
+    row = np.zeros(len(table.mutations))
+    for name in names:
+        i = table.index.get(name.strip().lower())
+        if i is not None:
+            row[i] = 1
+    return row
+
+
+def stack_matrix(stacks, table=TABLE):
+    # (K, M) 0/1 matrix from K lists of mutation names
+    if not stacks:
+        return np.zeros((0, len(table.mutations)))
+    return np.vstack([mutation_vector(names, table) for names in stacks])
+
+
+def weather_chances(extra=None, table=TABLE):
+    # (weathers, (W, M) chances), optionally with one more weather appended
+    # as (name, mutation names) using DEFAULT_CHANCE for each mutation, for a
+    # live weather crops.py doesn't know about
+    if extra is None or extra[0] in table.weathers:
+        return table.weathers, table.chances
+    name, names = extra
+    row = mutation_vector(names, table) * DEFAULT_CHANCE
+    return table.weathers + (name,), np.vstack([table.chances, row])
+
+
+def single_values(table=TABLE):
+    # (N, M) value of a base-weight fruit carrying exactly one mutation
+    return table.values[:, None] * (1 + table.bonuses)[None, :]
+
+
+def expected_values(chances, growth=1.0, weight=1.0, table=TABLE):
+    # (N, W) expected value per fruit for each weather row of chances (W, M).
+    # Mutations add linearly, so the expectation of the stacked multiplier is
+    # 1 + chances @ bonuses even though the mutations are rolled separately.
+    multiplier = (1 + np.atleast_2d(chances) @ table.bonuses) * growth * weight ** 2
+    return table.values[:, None] * multiplier[None, :]
+
+
+def stack_values(stacks, growth=1.0, weights=1.0, table=TABLE):
+    # (N, K) value of each seed's fruit for K stacks: stacks is (K, M) 0/1,
+    # growth and weights are scalars or (K,) arrays of multipliers and
+    # weight / base_weight ratios
+    multiplier = (1 + np.atleast_2d(stacks) @ table.bonuses) * growth * np.asarray(weights, dtype=float) ** 2
+    return table.values[:, None] * multiplier[None, :]
+
+
+def roi(values, harvests=1, table=TABLE):
+    # Return on the seed cost for (N, ...) fruit values when one seed yields
+    # `harvests` fruit
+    costs = table.costs.reshape((-1,) + (1,) * (np.ndim(values) - 1))
+    return (values * harvests - costs) / costs
@@ -0,0 +1,112 @@
+import logging
+from collections import namedtuple
+
+from categories import CATEGORIES
+from order import CATEGORY_RANKS, UNKNOWN_TIER, name_key
+from rarity import CATEGORY_RARITY, TIER_RANK
+
+logger = logging.getLogger(__name__)
+
+# One record per shop item. tier is the ordinal from rarity.RARITY_TIERS and
+# rank is the item's position in its category's display order.
+Item = namedtuple("Item", ["name", "category", "rarity", "tier", "icon", "cost", "rank", "slug", "image_url"])
+
+# Lookups for names the catalog does not know are kept, up to a point
+MAX_UNKNOWN_ITEMS = 1000
+
+
+def make_slug(category, name):
+    return name.lower().replace(" ", "") + CATEGORIES[category].slug_suffix
+
+
+def make_image_url(category, slug):
+    return f"{CATEGORIES[category].image_base_url}{slug}.webp"
+
+
+def _build():
+    by_name = {}
+    by_category = {}
+    by_tier = {}
+
+    for category, ranks in CATEGORY_RANKS.items():
+        rarities = CATEGORY_RARITY.get(category, {})
+        names = list(ranks) + [name for name in rarities if name not in ranks]
+        names.sort(key=name_key(category))
+
+        items = []
+        for rank, name in enumerate(names):
+            rarity_name, icon, cost = rarities.get(name, ("Unknown", None, 0))
+            slug = make_slug(category, name)
+            item = Item(
+                name=name,
+                category=category,
+                rarity=rarity_name,
+                tier=TIER_RANK.get(rarity_name, UNKNOWN_TIER),
+                icon=icon,
+                cost=cost,
+                rank=rank,
+                slug=slug,
+                image_url=make_image_url(category, slug),
+            )
+            items.append(item)
+            by_name.setdefault(name, item)
+            by_tier.setdefault(item.tier, []).append(item)
+        by_category[category] = tuple(items)
+
+    by_tier = {tier: tuple(items) for tier, items in sorted(by_tier.items())}
+    return by_name, by_category, by_tier
+
+
+def validate():
+    # Report names that the order lists and the rarity table disagree on
+    problems = []
+    seen = {}
+    for category, ranks in CATEGORY_RANKS.items():
+        rarities = CATEGORY_RARITY.get(category, {})
+        for name in ranks:
+            if rarities and name not in rarities:
+                problems.append(f"{category}: '{name}' is in the order list but has no rarity data")
+        for name in rarities:
+            if name not in ranks:
+                problems.append(f"{category}: '{name}' has rarity data but is not in the order list")
+        for name in set(ranks) | set(rarities):
+            if name in seen and seen[name] != category:
+                problems.append(f"'{name}' is listed under both {seen[name]} and {category}")
+            seen.setdefault(name, category)
+    return problems
+
+
+BY_NAME, BY_CATEGORY, BY_TIER = _build()
+
+_unknown = {}
+
+for _problem in validate():
+    logger.warning("Catalog mismatch: %s", _problem)
+
+
+def get_item(category, name):
+    # One dict lookup for known items. Names the catalog has never seen get a
+    # placeholder record that sorts after everything else.
+    item = BY_NAME.get(name)
+    if item is not None and item.category == category:
+        return item
+
+    key = (category, name)
+    item = _unknown.get(key)
+    if item is None:
+        if len(_unknown) >= MAX_UNKNOWN_ITEMS:
+            _unknown.clear()
+        slug = make_slug(category, name)
+        item = Item(
+            name=name,
+            category=category,
+            rarity="Unknown",
+            tier=UNKNOWN_TIER,
+            icon=None,
+            cost=0,
+            rank=len(BY_CATEGORY.get(category, ())),
+            slug=slug,
+            image_url=make_image_url(category, slug),
+        )
+        _unknown[key] = item
+    return item
@@ -0,0 +1,54 @@
+from collections import namedtuple
+
+from order import SEED_ORDER, EGG_ORDER, GEAR_ORDER, COSMETIC_ORDER
+
+# Everything that differs between the shop category pages.
+# Item images live at <image_base_url><slug>.webp, where the slug is the
+# lowercased name without spaces plus slug_suffix.
+CategoryConfig = namedtuple(
+    "CategoryConfig",
+    ["key", "endpoint", "title", "label", "order", "image_base_url", "slug_suffix", "image_caption"],
+)
+
+CATEGORIES = {
+    "seeds": CategoryConfig(
+        key="seeds",
+        endpoint="seeds",
+        title="🌾 Seed Stock",
+        label="Seed Stock",
+        order=SEED_ORDER,
+        image_base_url="https://growagardenpro.com/seeds/",
+        slug_suffix="seed",
+        image_caption=None,
+    ),
+    "eggs": CategoryConfig(
+        key="eggs",
+        endpoint="eggs",
+        title="🥚 Egg Stock",
+        label="Egg Stock",
+        order=EGG_ORDER,
+        image_base_url="https://growagardenpro.com/eggs/",
+        slug_suffix="",
+        image_caption=" ",
+    ),
+    "gear": CategoryConfig(
+        key="gear",
+        endpoint="gear",
+        title="⚙️ Gear Stock",
+        label="Gear Stock",
+        order=GEAR_ORDER,
+        image_base_url="https://growagardenpro.com/gear/",
+        slug_suffix="",
+        image_caption=" ",
+    ),
+    "cosmetics": CategoryConfig(
+        key="cosmetics",
+        endpoint="cosmetics",
+        title="✨ Cosmetic Stock",
+        label="Cosmetic Stock",
+        order=COSMETIC_ORDER,
+        image_base_url="https://growagardenpro.com/cosmetics/",
+        slug_suffix="",
+        image_caption=" ",
+    ),
+}
@@ -0,0 +1,97 @@
+# Approximate crop sell values for the profit calculator. These are community
+# figures for an unmutated fruit at its base weight, not values from the game
+# files, so treat results as estimates.
+
+# crop_name -> (base_sell_value, base_weight_kg)
+CROP_VALUES = {
+    "Carrot": (18, 0.24),
+    "Strawberry": (14, 0.29),
+    "Blueberry": (18, 0.17),
+    "Orange Tulip": (767, 0.05),
+    "Tomato": (27, 0.44),
+    "Corn": (36, 1.9),
+    "Daffodil": (903, 0.16),
+    "Watermelon": (2708, 7.3),
+    "Pumpkin": (3069, 6.9),
+    "Apple": (248, 2.85),
+    "Bamboo": (3610, 3.8),
+    "Coconut": (361, 13.31),
+    "Cactus": (3069, 6.65),
+    "Dragon Fruit": (4287, 11.38),
+    "Mango": (5866, 14.28),
+    "Grape": (7085, 2.85),
+    "Mushroom": (136278, 25.9),
+    "Pepper": (7220, 4.75),
+    "Cacao": (10830, 7.6),
+    "Beanstalk": (25270, 9.5),
+    "Ember Lily": (50138, 11.4),
+    "Sugar Apple": (43320, 8.55),
+    "Burning Bud": (63180, 11.4),
+    "Giant Pinecone": (64980, 5.14),
+    "Elder Strawberry": (70000, 2.85),
+    "Romanesco": (88000, 3.8),
+}
+
+# Growth mutations replace each other, only the best one counts
+GROWTH_MUTATIONS = {
+    "Gold": 20,
+    "Rainbow": 50,
+}
+
+# Environmental mutation -> value multiplier. These stack additively:
+# a fruit with mutations m1..mk is worth base * (1 + sum(m_i - 1)).
+MUTATIONS = {
+    "Wet": 2,
+    "Chilled": 2,
+    "Chocolate": 2,
+    "Moonlit": 2,
+    "Windstruck": 2,
+    "Pollinated": 3,
+    "Sandy": 3,
+    "Bloodlit": 4,
+    "Burnt": 4,
+    "Verdant": 4,
+    "Plasma": 5,
+    "Heavenly": 5,
+    "Twisted": 5,
+    "Drenched": 5,
+    "Clay": 5,
+    "Cloudtouched": 5,
+    "Fried": 8,
+    "Frozen": 10,
+    "Cooked": 10,
+    "Amber": 10,
+    "Zombified": 25,
+    "Molten": 25,
+    "Ceramic": 30,
+    "Sundried": 85,
+    "Aurora": 90,
+    "Shocked": 100,
+    "Paradisal": 100,
+    "Alienlike": 100,
+    "Celestial": 120,
+    "Galactic": 120,
+    "Disco": 125,
+    "Meteoric": 125,
+    "Voidtouched": 135,
+    "Dawnbound": 150,
+}
+
+# Weather -> {mutation: rough share of fruit that mutation lands on while the
+# weather lasts}. "Clear" is the no-weather baseline.
+WEATHER_MUTATIONS = {
+    "Clear": {},
+    "Rain": {"Wet": 0.5},
+    "Thunderstorm": {"Wet": 0.5, "Shocked": 0.01},
+    "Frost": {"Chilled": 0.5, "Wet": 0.1},
+    "Night": {"Moonlit": 0.1},
+    "Blood Moon": {"Bloodlit": 0.1},
+    "Meteor Shower": {"Celestial": 0.02},
+    "Chocolate Rain": {"Chocolate": 0.3},
+    "Tropical Rain": {"Drenched": 0.3},
+    "Sandstorm": {"Sandy": 0.2},
+    "Windy": {"Windstruck": 0.2},
+    "Heatwave": {"Sundried": 0.05},
+    "Aurora Borealis": {"Aurora": 0.05},
+    "Disco": {"Disco": 0.05},
+}
@@ -0,0 +1,292 @@
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import threading
+import time
+
+import image_cache
+import normalize
+import stock_api
+from catalog import get_item
+from categories import CATEGORIES
+from order import sort_items
+from restock import RESTOCK_INTERVALS
+
+logger = logging.getLogger(__name__)
+
+# Pre-renders the current stock to static files, so read-only "what's in
+# stock" traffic can be served by any static file server or CDN:
+#
+#   <out>/index.html                    every category on one page
+#   <out>/<endpoint>.html / .json       seeds, eggs, gear, cosmetics, weather
+#   <out>/images/<content hash>.<ext>   item thumbnails and rarity icons
+#   <out>/manifest.json                 snapshot hash and files per endpoint
+#
+# Images are named by their content hash, so they can be cached forever.
+# Export is incremental: an endpoint whose snapshot hash matches the manifest
+# is not rewritten, unless its last export fell back to the placeholder for
+# an image that could not be fetched. Images are only fetched for endpoints
+# that are rewritten. Pages hold no timestamps of their own (the restock
+# countdown runs in the browser), so unchanged stock means unchanged files.
+#
+#   python Web/export_static.py [--out site] [--force] [--prune]
+
+DEFAULT_OUT_DIR = "site"
+IMAGE_SUBDIR = "images"
+MANIFEST_NAME = "manifest.json"
+
+EXPORT_ENDPOINTS = (*stock_api.CATEGORY_ENDPOINTS, "weather")
+
+WEATHER_TITLE = "🌥️ Weather"
+
+STYLE = """
+body { font-family: system-ui, sans-serif; background: #1C301C; color: #E8F5E9; margin: 0 auto; max-width: 960px; padding: 1rem; }
+a { color: #8BC34A; }
+nav a { margin-right: 1rem; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 2rem; }
+th, td { border-bottom: 1px solid #2E482E; padding: 0.4rem; text-align: left; vertical-align: middle; }
+td img { vertical-align: middle; }
+.muted { color: #A5D6A7; font-size: 0.9rem; }
+"""
+
+# Counts down to the next wall-clock restock boundary, like restock.py
+COUNTDOWN_SCRIPT = """
+<script>
+for (const el of document.querySelectorAll("[data-interval]")) {
+  const interval = Number(el.dataset.interval);
+  const tick = () => {
+    const now = Date.now() / 1000;
+    const left = Math.ceil((Math.floor(now / interval) + 1) * interval - now);
+    el.textContent = `${Math.floor(left / 60)}m ${left % 60}s`;
+  };
+  tick();
+  setInterval(tick, 1000);
+}
+</script>
+"""
+
+
+def snapshot_hash(endpoint, records):
+    payload = normalize.to_payload(endpoint, records)
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _write(path, data):
+    # Atomic, so a server never hands out half a file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_text(path, text):
+    _write(path, text.encode("utf-8"))
+
+
+def image_path(data, ext):
+    # Relative path image bytes are stored under: named by their content hash
+    return f"{IMAGE_SUBDIR}/{hashlib.sha1(data).hexdigest()[:16]}{ext}"
+
+
+def write_image(out_dir, data, ext):
+    # Store image bytes under their content hash; returns the relative path
+    relative = image_path(data, ext)
+    path = os.path.join(out_dir, relative)
+    if not os.path.exists(path):
+        _write(path, data)
+    return relative
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable manifest: %s", e)
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def stock_document(out_dir, category, records):
+    # JSON-ready rows in display order, with catalog metadata and image paths
+    rows = []
+    for record in sort_items(category, records):
+        item = get_item(category, record.name)
+        icon = image_cache.rarity_icon(item.icon)
+        rows.append({
+            "name": item.name,
+            "quantity": record.quantity,
+            "rarity": item.rarity,
+            "cost": item.cost,
+            "image": write_image(out_dir, image_cache.get_thumbnail(item.image_url), ".png"),
+            "rarity_icon": write_image(out_dir, icon, os.path.splitext(item.icon)[1].lower()) if icon else None,
+        })
+    return {"endpoint": category, "restock_interval": RESTOCK_INTERVALS.get(category), "items": rows}
+
+
+def weather_document(weather):
+    return {"endpoint": "weather", "restock_interval": RESTOCK_INTERVALS.get("weather"), **weather._asdict()}
+
+
+def _title(endpoint):
+    return CATEGORIES[endpoint].title if endpoint in CATEGORIES else WEATHER_TITLE
+
+
+def _page(title, body):
+    links = "".join(f'<a href="{endpoint}.html">{html.escape(_title(endpoint))}</a>' for endpoint in EXPORT_ENDPOINTS)
+    return (
+        "<!DOCTYPE html>\n"
+        '<html lang="en"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>{html.escape(title)}</title><style>{STYLE}</style></head>"
+        f'<body><nav><a href="index.html">🌱 All stock</a>{links}</nav>{body}{COUNTDOWN_SCRIPT}</body></html>\n'
+    )
+
+
+def _countdown(interval):
+    if not interval:
+        return ""
+    return f'<p class="muted">Next restock in <span data-interval="{interval}"></span></p>'
+
+
+def stock_section(document):
+    category = CATEGORIES[document["endpoint"]]
+    rows = "".join(
+        "<tr>"
+        f'<td><img src="{item["image"]}" width="{image_cache.THUMBNAIL_WIDTH}" alt=""></td>'
+        f"<td>{html.escape(item['name'])}</td>"
+        f"<td>{item['quantity']}</td>"
+        + (f'<td><img src="{item["rarity_icon"]}" height="20" alt=""> ' if item["rarity_icon"] else "<td>")
+        + f"{html.escape(item['rarity'])}</td>"
+        f"<td>{item['cost']:,}</td>"
+        "</tr>"
+        for item in document["items"]
+    )
+    return (
+        f"<h2>{html.escape(category.title)}</h2>{_countdown(document['restock_interval'])}"
+        "<table><tr><th></th><th>Item</th><th>Stock</th><th>Rarity</th><th>Cost</th></tr>"
+        f"{rows}</table>"
+        if rows
+        else f"<h2>{html.escape(category.title)}</h2><p>Nothing in stock.</p>"
+    )
+
+
+def weather_section(document):
+    mutations = "".join(f"<li>{html.escape(m)}</li>" for m in document["mutations"])
+    return (
+        f"<h2>{html.escape(WEATHER_TITLE)}</h2>"
+        f"<h3>{html.escape(document['icon'])} {html.escape(document['name'])}</h3>"
+        f"<p>{html.escape(document['description'])}</p>"
+        f"<p>Effect on crops: {html.escape(document['crop_bonuses'])}<br>Rarity: {html.escape(document['rarity'])}</p>"
+        + (f"<p>Mutations available:</p><ul>{mutations}</ul>" if mutations else "")
+    )
+
+
+def _section(document):
+    return weather_section(document) if document["endpoint"] == "weather" else stock_section(document)
+
+
+def export(out_dir=DEFAULT_OUT_DIR, force=False):
+    # Fetch every endpoint once and write what changed.
+    # Returns {endpoint: "written" | "unchanged" | "failed"}.
+    manifest = load_manifest(out_dir)
+    # Skip the stale last good responses stock_api primes its cache with, so
+    # every endpoint is fetched fresh
+    stock_api.invalidate()
+    fetched = stock_api.fetch_many(EXPORT_ENDPOINTS)
+
+    results = {}
+    for endpoint in EXPORT_ENDPOINTS:
+        records = fetched[endpoint]
+        if isinstance(records, Exception):
+            # Keep whatever was exported last time
+            logger.warning("Fetching %s failed, keeping the previous export: %s", endpoint, records)
+            results[endpoint] = "failed"
+            continue
+
+        digest = snapshot_hash(endpoint, records)
+        files = [f"{endpoint}.json", f"{endpoint}.html"]
+        previous = manifest.get(endpoint) or {}
+        if (
+            not force
+            and previous.get("hash") == digest
+            and not previous.get("placeholders")
+            and all(os.path.exists(os.path.join(out_dir, name)) for name in files)
+        ):
+            results[endpoint] = "unchanged"
+            continue
+
+        placeholders = 0
+        if endpoint == "weather":
+            document = weather_document(records)
+        else:
+            # Fetch this endpoint's images, all at once, only now it is written
+            image_cache.prefetch(get_item(endpoint, record.name).image_url for record in records)
+            document = stock_document(out_dir, endpoint, records)
+            placeholder = image_path(image_cache.placeholder(), ".png")
+            placeholders = sum(item["image"] == placeholder for item in document["items"])
+        _write_text(os.path.join(out_dir, f"{endpoint}.json"), json.dumps(document, ensure_ascii=False, indent=1))
+        _write_text(os.path.join(out_dir, f"{endpoint}.html"), _page(_title(endpoint), _section(document)))
+        manifest[endpoint] = {"hash": digest, "files": files, "placeholders": placeholders, "exported_at": time.time()}
+        results[endpoint] = "written"
+
+    index_path = os.path.join(out_dir, "index.html")
+    if force or "written" in results.values() or not os.path.exists(index_path):
+        sections = []
+        for endpoint in EXPORT_ENDPOINTS:
+            try:
+                with open(os.path.join(out_dir, f"{endpoint}.json"), encoding="utf-8") as f:
+                    sections.append(_section(json.load(f)))
+            except (OSError, ValueError):
+                continue
+        _write_text(index_path, _page("Grow a Garden stock", "".join(sections)))
+        _write_text(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=1, sort_keys=True))
+    return results
+
+
+def prune_images(out_dir):
+    # Remove images no exported JSON refers to any more. Returns the count.
+    used = set()
+    for endpoint in stock_api.CATEGORY_ENDPOINTS:
+        try:
+            with open(os.path.join(out_dir, f"{endpoint}.json"), encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for item in document.get("items", ()):
+            used.update(filter(None, (item.get("image"), item.get("rarity_icon"))))
+
+    image_dir = os.path.join(out_dir, IMAGE_SUBDIR)
+    removed = 0
+    for name in os.listdir(image_dir) if os.path.isdir(image_dir) else ():
+        if f"{IMAGE_SUBDIR}/{name}" not in used:
+            os.remove(os.path.join(image_dir, name))
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the current stock as static HTML and JSON")
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR, help="output directory")
+    parser.add_argument("--force", action="store_true", help="rewrite files even if the stock is unchanged")
+    parser.add_argument("--prune", action="store_true", help="delete images nothing refers to any more")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = export(args.out, args.force)
+    for endpoint, result in results.items():
+        print(f"{endpoint:<10} {result}")
+    if args.prune:
+        print(f"Pruned {prune_images(args.out)} unused images")
+    if all(result == "failed" for result in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from restock import DEFAULT_INTERVAL, RESTOCK_INTERVALS
+from settings import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Append-only stock history, one row per distinct snapshot, plus the restock
+# cycles each endpoint and item was seen in, for restock_frequency()
+DB_PATH = os.path.join(DATA_DIR, "history.sqlite3")
+
+# Only the shop categories have per-item stock worth recording
+HISTORY_ENDPOINTS = ("seeds", "eggs", "gear", "cosmetics")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_endpoint_time ON snapshots (endpoint, first_seen);
+
+CREATE TABLE IF NOT EXISTS stock (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    item TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stock_item_time ON stock (item, seen_at);
+CREATE INDEX IF NOT EXISTS stock_snapshot ON stock (snapshot_id);
+
+CREATE TABLE IF NOT EXISTS restocks (
+    endpoint TEXT NOT NULL,
+    cycle INTEGER NOT NULL,
+    PRIMARY KEY (endpoint, cycle)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS restock_items (
+    endpoint TEXT NOT NULL,
+    cycle INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (endpoint, cycle, item)
+) WITHOUT ROWID;
+"""
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_schema_ready = False
+# endpoint -> (snapshot id, content hash, last_seen) of the newest row, so
+# unchanged polls only touch last_seen
+_latest = {}
+
+
+def connect():
+    # One connection per thread; WAL lets page readers run alongside the poller
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not _schema_ready:
+            with _write_lock:
+                conn.executescript(SCHEMA)
+                _backfill_cycles(conn)
+            _schema_ready = True
+        _local.conn = conn
+    return conn
+
+
+def stock_items(records):
+    # (name, quantity) pairs from normalized stock records, in a stable order
+    return sorted((item.name, item.quantity) for item in records)
+
+
+def content_hash(items):
+    return hashlib.sha1(json.dumps(items, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def cycle_of(endpoint, ts):
+    # Index of the wall-clock restock cycle ts falls in (see restock.py)
+    return int(ts // RESTOCK_INTERVALS.get(endpoint, DEFAULT_INTERVAL))
+
+
+def _mark_cycles(conn, endpoint, first_seen, last_seen, names):
+    # Record that the endpoint restocked, with names in stock, in every cycle
+    # from first_seen to last_seen
+    cycles = range(cycle_of(endpoint, first_seen), cycle_of(endpoint, last_seen) + 1)
+    conn.executemany("INSERT OR IGNORE INTO restocks (endpoint, cycle) VALUES (?, ?)", [(endpoint, c) for c in cycles])
+    conn.executemany(
+        "INSERT OR IGNORE INTO restock_items (endpoint, cycle, item) VALUES (?, ?, ?)",
+        [(endpoint, c, name) for c in cycles for name in names],
+    )
+
+
+def _backfill_cycles(conn):
+    # Histories recorded before the cycle tables existed: expand every
+    # snapshot once. A snapshot spans every cycle from first to last sighting.
+    if conn.execute("SELECT 1 FROM restocks LIMIT 1").fetchone() is not None:
+        return
+    rows = conn.execute(
+        """
+        SELECT s.id, s.endpoint, s.first_seen, s.last_seen, st.item FROM snapshots s
+        LEFT JOIN stock st ON st.snapshot_id = s.id AND st.quantity > 0
+        ORDER BY s.id
+        """
+    ).fetchall()
+    if not rows:
+        return
+    with conn:
+        current = None
+        names = []
+        for snapshot_id, endpoint, first_seen, last_seen, item in rows:
+            if current is not None and current[0] != snapshot_id:
+                _mark_cycles(conn, *current[1:], names)
+                names = []
+            current = (snapshot_id, endpoint, first_seen, last_seen)
+            if item is not None:
+                names.append(item)
+        _mark_cycles(conn, *current[1:], names)
+    logger.info("Backfilled restock cycles from %d history rows", len(rows))
+
+
+def _load_latest(conn, endpoint):
+    row = conn.execute(
+        "SELECT id, content_hash, last_seen FROM snapshots WHERE endpoint = ? ORDER BY first_seen DESC LIMIT 1",
+        (endpoint,),
+    ).fetchone()
+    return tuple(row) if row else None
+
+
+def record(endpoint, records, seen_at=None):
+    # Store a snapshot if it differs from the last one for this endpoint.
+    # Returns True if a new snapshot was written.
+    if endpoint not in HISTORY_ENDPOINTS:
+        return False
+    if seen_at is None:
+        seen_at = time.time()
+    items = stock_items(records)
+    digest = content_hash(items)
+
+    conn = connect()
+    with _write_lock, conn:
+        if endpoint not in _latest:
+            _latest[endpoint] = _load_latest(conn, endpoint)
+        latest = _latest[endpoint]
+
+        in_stock = [name for name, quantity in items if quantity > 0]
+        if latest is not None and latest[1] == digest:
+            conn.execute("UPDATE snapshots SET last_seen = ? WHERE id = ?", (seen_at, latest[0]))
+            # Unchanged stock carries on through any restocks since the last poll
+            _mark_cycles(conn, endpoint, latest[2], seen_at, in_stock)
+            _latest[endpoint] = (latest[0], digest, seen_at)
+            return False
+
+        cur = conn.execute(
+            "INSERT INTO snapshots (endpoint, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?)",
+            (endpoint, digest, seen_at, seen_at),
+        )
+        snapshot_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO stock (snapshot_id, item, quantity, seen_at) VALUES (?, ?, ?, ?)",
+            [(snapshot_id, name, quantity, seen_at) for name, quantity in items],
+        )
+        _mark_cycles(conn, endpoint, seen_at, seen_at, in_stock)
+        _latest[endpoint] = (snapshot_id, digest, seen_at)
+    return True
+
+
+def last_in_stock(item):
+    # Newest time the item was observed in stock, or None
+    row = connect().execute(
+        """
+        SELECT MAX(s.last_seen) FROM stock st
+        JOIN snapshots s ON s.id = st.snapshot_id
+        WHERE st.item = ? AND st.quantity > 0
+        """,
+        (item,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def item_history(item, since=0, limit=500):
+    # Appearances of an item, newest first: (first_seen, last_seen, quantity)
+    return connect().execute(
+        """
+        SELECT s.first_seen, s.last_seen, st.quantity FROM stock st
+        JOIN snapshots s ON s.id = st.snapshot_id
+        WHERE st.item = ? AND s.last_seen >= ?
+        ORDER BY st.seen_at DESC
+        LIMIT ?
+        """,
+        (item, since, limit),
+    ).fetchall()
+
+
+def restock_frequency(endpoint, since=0):
+    # Per item: how many restock cycles it was in stock for, out of all cycles
+    # the history covers for the endpoint, counting the cycle since falls in.
+    # Both are index range counts over the cycle tables record() keeps up to
+    # date. Returns (total, {item: count}).
+    first_cycle = cycle_of(endpoint, since)
+    conn = connect()
+    total = conn.execute(
+        "SELECT COUNT(*) FROM restocks WHERE endpoint = ? AND cycle >= ?",
+        (endpoint, first_cycle),
+    ).fetchone()[0]
+    counts = conn.execute(
+        "SELECT item, COUNT(*) FROM restock_items WHERE endpoint = ? AND cycle >= ? GROUP BY item",
+        (endpoint, first_cycle),
+    ).fetchall()
+    return total, dict(counts)
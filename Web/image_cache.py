@@ -0,0 +1,300 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import stock_api
+from settings import BASE_DIR, CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Local rarity icons shipped with the app
+IMG_FOLDER = os.path.join(os.path.dirname(__file__), "pages", "Images")
+
+# Item images are fetched once, shrunk and kept on disk here
+IMAGE_DIR = os.path.join(CACHE_DIR, "images")
+
+# Thumbnails for table cells, published under Web/static/ by content hash so
+# the browser fetches each one once instead of receiving it inline per row.
+# Needs server.enableStaticServing (see .streamlit/config.toml).
+STATIC_IMAGE_DIR = os.path.join(BASE_DIR, "static", "thumbnails")
+STATIC_IMAGE_URL = "/app/static/thumbnails"
+
+THUMBNAIL_WIDTH = 75
+IMAGE_TIMEOUT = 5
+
+# In-memory LRU on top of the disk store, bounded by total bytes
+MEMORY_BUDGET = 8 * 1024 * 1024
+
+# 404s are remembered for a long time, other failures only briefly
+NEGATIVE_TTL = 6 * 3600
+ERROR_TTL = 60
+
+PREFETCH_WORKERS = 8
+
+_memory = OrderedDict()
+_memory_bytes = 0
+_missing = {}
+_lock = threading.Lock()
+# url -> Future of the fetch in progress, so a URL is fetched once at a time
+_in_flight = {}
+_executor = None
+
+_placeholder = None
+_rarity_icons = None
+# filename -> PNG thumbnail of a rarity icon (first frame for GIFs)
+_rarity_thumbnails = {}
+# bytes -> URL, for table cells that only accept URLs
+_urls = {}
+
+stats = {"memory_hits": 0, "disk_hits": 0, "fetches": 0, "missing": 0}
+
+
+def _cache_path(url):
+    return os.path.join(IMAGE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+
+def _remember(url, data):
+    global _memory_bytes
+    with _lock:
+        old = _memory.pop(url, None)
+        if old is not None:
+            _memory_bytes -= len(old)
+        _memory[url] = data
+        _memory_bytes += len(data)
+        while _memory_bytes > MEMORY_BUDGET and len(_memory) > 1:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def _make_thumbnail(raw, colors=None):
+    # colors: reduce to a palette of that many colors, for flat artwork
+    from PIL import Image
+
+    with Image.open(io.BytesIO(raw)) as img:
+        img = img.convert("RGBA")
+        if img.width > THUMBNAIL_WIDTH:
+            height = max(1, round(img.height * THUMBNAIL_WIDTH / img.width))
+            img = img.resize((THUMBNAIL_WIDTH, height), Image.LANCZOS)
+        if colors:
+            img = img.quantize(colors, method=Image.Quantize.FASTOCTREE)
+        out = io.BytesIO()
+        img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _write_disk(path, data):
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def placeholder():
+    # A plain grey tile shown for images that are missing upstream
+    global _placeholder
+    if _placeholder is None:
+        from PIL import Image
+
+        out = io.BytesIO()
+        Image.new("RGBA", (THUMBNAIL_WIDTH, THUMBNAIL_WIDTH), (128, 128, 128, 96)).save(out, format="PNG")
+        _placeholder = out.getvalue()
+    return _placeholder
+
+
+def _lookup(url):
+    # Memory, then disk. Returns None on a miss.
+    with _lock:
+        data = _memory.get(url)
+        if data is not None:
+            _memory.move_to_end(url)
+            stats["memory_hits"] += 1
+            return data
+
+    path = _cache_path(url)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    with _lock:
+        stats["disk_hits"] += 1
+    _remember(url, data)
+    return data
+
+
+def _is_missing(url):
+    with _lock:
+        expires = _missing.get(url)
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            return True
+        _missing.pop(url, None)
+        return False
+
+
+def _mark_missing(url, ttl, counter=None):
+    with _lock:
+        if counter is not None:
+            stats[counter] += 1
+        _missing[url] = time.monotonic() + ttl
+
+
+def _fetch(url):
+    # Runs on the prefetch workers, so shared state is only touched under _lock
+    with _lock:
+        stats["fetches"] += 1
+    try:
+        resp = stock_api.get_client().get(url, timeout=IMAGE_TIMEOUT)
+        if resp.status_code == 404:
+            _mark_missing(url, NEGATIVE_TTL, "missing")
+            return None
+        resp.raise_for_status()
+        data = _make_thumbnail(resp.content)
+    except Exception as e:
+        logger.warning("Could not cache image %s: %s", url, e)
+        _mark_missing(url, ERROR_TTL)
+        return None
+
+    try:
+        _write_disk(_cache_path(url), data)
+    except OSError as e:
+        logger.warning("Could not write image cache for %s: %s", url, e)
+    _remember(url, data)
+    return data
+
+
+def get_thumbnail(url):
+    # PNG bytes of a THUMBNAIL_WIDTH-wide thumbnail. Never waits on the
+    # network: an uncached image starts a background fetch and shows the
+    # placeholder until it lands, as does an image missing upstream.
+    if _is_missing(url):
+        return placeholder()
+    data = _lookup(url)
+    if data is None:
+        _schedule(url)
+        return placeholder()
+    return data
+
+
+def _schedule(url):
+    # Start a background fetch for url unless one is already running
+    global _executor
+    with _lock:
+        future = _in_flight.get(url)
+        if future is not None:
+            return future
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="image-fetch")
+        future = _executor.submit(_fetch, url)
+        _in_flight[url] = future
+    future.add_done_callback(lambda _: _forget(url))
+    return future
+
+
+def _forget(url):
+    with _lock:
+        _in_flight.pop(url, None)
+
+
+def _pending(urls):
+    return [url for url in dict.fromkeys(urls) if not _is_missing(url) and _lookup(url) is None]
+
+
+def warm(urls):
+    # Fetch every uncached URL in the background and return straight away.
+    # The poller calls this when new stock lands, before pages render it.
+    for url in _pending(urls):
+        _schedule(url)
+
+
+def prefetch(urls):
+    # Fetch every uncached URL concurrently and wait for them all, for callers
+    # that need the real images (the static export)
+    futures = [_schedule(url) for url in _pending(urls)]
+    if futures:
+        wait(futures)
+
+
+def rarity_icon(filename):
+    # Local rarity icons are read once per process
+    global _rarity_icons
+    if _rarity_icons is None:
+        icons = {}
+        for name in os.listdir(IMG_FOLDER):
+            with open(os.path.join(IMG_FOLDER, name), "rb") as f:
+                icons[name] = f.read()
+        _rarity_icons = icons
+    if not filename:
+        return None
+    return _rarity_icons.get(filename)
+
+
+def _static_url(data):
+    # URL of a PNG published under STATIC_IMAGE_DIR, or a data: URI if the
+    # app directory is not writable
+    url = _urls.get(data)
+    if url is None:
+        name = f"{hashlib.sha1(data).hexdigest()[:16]}.png"
+        path = os.path.join(STATIC_IMAGE_DIR, name)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(STATIC_IMAGE_DIR, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            url = f"{STATIC_IMAGE_URL}/{name}"
+        except OSError as e:
+            logger.warning("Could not publish thumbnail %s: %s", name, e)
+            url = f"data:image/png;base64,{base64.b64encode(data).decode('ascii')}"
+        if len(_urls) >= 512:
+            _urls.clear()
+        _urls[data] = url
+    return url
+
+
+def thumbnail_url(url):
+    return _static_url(get_thumbnail(url))
+
+
+def rarity_icon_thumbnail(filename):
+    # Some icons are multi-megabyte animated GIFs; table cells get a
+    # THUMBNAIL_WIDTH-wide 256 color still of the first frame instead
+    data = _rarity_thumbnails.get(filename)
+    if data is None:
+        raw = rarity_icon(filename)
+        if raw is None:
+            return None
+        try:
+            data = _make_thumbnail(raw, colors=256)
+        except Exception as e:
+            logger.warning("Could not shrink rarity icon %s: %s", filename, e)
+            return None
+        _rarity_thumbnails[filename] = data
+    return data
+
+
+def rarity_icon_url(filename):
+    data = rarity_icon_thumbnail(filename)
+    if data is None:
+        return None
+    return _static_url(data)
+
+
+def cache_stats():
+    with _lock:
+        return {
+            **stats,
+            "memory_items": len(_memory),
+            "memory_bytes": _memory_bytes,
+            "negative_items": len(_missing),
+            "in_flight": len(_in_flight),
+        }
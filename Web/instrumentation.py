@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+# Process-wide timing spans, shared by every session:
+#
+#   with instrumentation.span("fetch", endpoint="seeds"):
+#       ...
+#
+# Each (name, labels) pair keeps Prometheus-style cumulative buckets for the
+# whole process lifetime, plus the most recent samples for p50/p95/p99.
+
+# Bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# Percentiles are taken over this many of the latest samples per series
+RECENT_SAMPLES = 1024
+
+METRIC_PREFIX = "gag"
+
+Summary = namedtuple("Summary", ["name", "labels", "count", "mean", "p50", "p95", "p99", "max"])
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+
+# (name, ((label, value), ...)) -> Histogram
+_histograms = {}
+_lock = threading.Lock()
+
+
+def _series(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    key = _series(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def span(name, **labels):
+    # Times the block, including when it raises
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def percentile(samples, q):
+    # Nearest rank on already sorted samples
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+
+
+def summary():
+    # One Summary per series, in seconds, sorted by name then labels
+    with _lock:
+        series = [(key, histogram.count, histogram.total, sorted(histogram.recent)) for key, histogram in _histograms.items()]
+    return [
+        Summary(
+            name=name,
+            labels=dict(labels),
+            count=count,
+            mean=total / count if count else 0.0,
+            p50=percentile(recent, 0.50),
+            p95=percentile(recent, 0.95),
+            p99=percentile(recent, 0.99),
+            max=recent[-1] if recent else 0.0,
+        )
+        for (name, labels), count, total, recent in sorted(series)
+    ]
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def prometheus_text(counters=None):
+    # Prometheus text exposition: one histogram per span name, plus any
+    # {metric name: value} counters passed in
+    with _lock:
+        series = [(key, list(h.counts), h.count, h.total) for key, h in _histograms.items()]
+
+    lines = []
+    by_name = {}
+    for (name, labels), counts, count, total in sorted(series):
+        by_name.setdefault(name, []).append((labels, counts, count, total))
+
+    for name, entries in by_name.items():
+        metric = f"{METRIC_PREFIX}_{name}_seconds"
+        lines.append(f"# HELP {metric} Time spent in {name} spans.")
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, counts, count, total in entries:
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', _format_bound(bound))])} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+
+    for name, value in sorted((counters or {}).items()):
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,287 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import image_cache
+import instrumentation
+import normalize
+import poller
+import stock_api
+from settings import MIRROR_HOST, MIRROR_PORT
+
+logger = logging.getLogger(__name__)
+
+# Read-only JSON mirror of the poller's snapshots, served next to Streamlit
+# so bots and scripts share the dashboard's upstream polls:
+#
+#   GET /seeds /eggs /gear /cosmetics /weather   one endpoint
+#   GET /all                                     every endpoint in one document
+#   GET /stream[?endpoints=seeds,gear]           server-sent events, pushed on change
+#   GET /metrics                                 Prometheus text: span timings and cache counters
+#
+# Stock is served normalized, in the upstream's JSON shape. Responses carry a
+# weak ETag of the stock data (If-None-Match -> 304) and are gzipped when the
+# client accepts it. Bodies are encoded once per poll, not once per request.
+
+ALL_PATH = "all"
+STREAM_PATH = "stream"
+METRICS_PATH = "metrics"
+
+# SSE comment sent while nothing changes, so proxies keep the stream open
+STREAM_KEEPALIVE = 15
+MAX_STREAMS = 100
+
+# Not worth compressing below this
+MIN_GZIP_SIZE = 512
+
+# One encoded response: raw JSON, gzipped JSON (or None) and its ETag
+Body = namedtuple("Body", ["raw", "gzipped", "etag"])
+
+# path -> (snapshots the body was built from, Body)
+_bodies = {}
+_bodies_lock = threading.Lock()
+
+_server = None
+_start_lock = threading.Lock()
+_stop = threading.Event()
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _document(snapshot):
+    return {
+        "endpoint": snapshot.endpoint,
+        "fetched_at": snapshot.fetched_at,
+        "last_error": snapshot.last_error,
+        "data": normalize.to_payload(snapshot.endpoint, snapshot.data),
+    }
+
+
+def _encode(path, snapshots):
+    if path == ALL_PATH:
+        document = {snapshot.endpoint: _document(snapshot) for snapshot in snapshots}
+    else:
+        document = _document(snapshots[0])
+    raw = _dumps(document)
+
+    # The ETag only covers the stock itself, so a poll that returns the same
+    # stock still answers If-None-Match with 304
+    digest = hashlib.sha1()
+    for snapshot in snapshots:
+        digest.update(snapshot.endpoint.encode("utf-8"))
+        digest.update(_dumps(normalize.to_payload(snapshot.endpoint, snapshot.data)))
+    etag = f'W/"{digest.hexdigest()[:20]}"'
+
+    gzipped = gzip.compress(raw, compresslevel=6) if len(raw) >= MIN_GZIP_SIZE else None
+    return Body(raw, gzipped, etag)
+
+
+def get_body(path):
+    # Encoded response for an endpoint name or ALL_PATH, or None before the
+    # first poll has landed
+    endpoints = stock_api.ENDPOINTS if path == ALL_PATH else (path,)
+    snapshots = tuple(poller.get_snapshot(endpoint) for endpoint in endpoints)
+    snapshots = tuple(snapshot for snapshot in snapshots if snapshot is not None)
+    if not snapshots:
+        return None
+
+    cached = _bodies.get(path)
+    if cached is not None and len(cached[0]) == len(snapshots) and all(a is b for a, b in zip(cached[0], snapshots)):
+        return cached[1]
+    body = _encode(path, snapshots)
+    with _bodies_lock:
+        _bodies[path] = (snapshots, body)
+    return body
+
+
+def metrics_counters():
+    counters = {}
+    for prefix, values in (("stock_cache", stock_api.stats), ("normalize", normalize.stats), ("image_cache", image_cache.stats)):
+        counters.update((f"{prefix}_{name}_total", value) for name, value in values.items())
+    return counters
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    if "*" in tags:
+        return True
+    # Weak comparison, as If-None-Match requires
+    return etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    server_version = "GrowAGardenMirror/1"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.strip("/")
+        if path == STREAM_PATH:
+            self._stream(parse_qs(url.query))
+            return
+        if path == METRICS_PATH:
+            self._metrics()
+            return
+        if path != ALL_PATH and path not in stock_api.ENDPOINTS:
+            self._send_error(404, f"Unknown endpoint: /{path}")
+            return
+
+        body = get_body(path)
+        if body is None:
+            self._send_error(503, "No stock has been fetched yet", retry_after=10)
+            return
+
+        if _etag_matches(self.headers.get("If-None-Match"), body.etag):
+            self.send_response(304)
+            self._send_common_headers(body.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload = body.raw
+        use_gzip = body.gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            payload = body.gzipped
+        self.send_response(200)
+        self._send_common_headers(body.etag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _metrics(self):
+        payload = instrumentation.prometheus_text(metrics_counters()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_common_headers(self, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def _send_error(self, status, message, retry_after=None):
+        payload = _dumps({"error": message})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, query):
+        endpoints = [name for value in query.get("endpoints", []) for name in value.split(",") if name]
+        endpoints = endpoints or list(stock_api.ENDPOINTS)
+        unknown = [name for name in endpoints if name not in stock_api.ENDPOINTS]
+        if unknown:
+            self._send_error(404, f"Unknown endpoints: {', '.join(unknown)}")
+            return
+        if not _stream_slots.acquire(blocking=False):
+            self._send_error(503, "Too many open streams", retry_after=30)
+            return
+
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("X-Accel-Buffering", "no")
+            self.end_headers()
+            self.close_connection = True
+
+            # Read the version first, so a change that lands while the
+            # current snapshots are sent still wakes the loop below
+            version = poller.version()
+            sent = {}
+            while not _stop.is_set():
+                for endpoint in endpoints:
+                    snapshot = poller.get_snapshot(endpoint)
+                    if snapshot is None or sent.get(endpoint) is snapshot.data:
+                        continue
+                    body = get_body(endpoint)
+                    self.wfile.write(f"event: {endpoint}\nid: {version}\ndata: ".encode("utf-8") + body.raw + b"\n\n")
+                    sent[endpoint] = snapshot.data
+                self.wfile.flush()
+
+                latest = poller.wait_for_change(version, STREAM_KEEPALIVE)
+                if latest == version:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                version = latest
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            _stream_slots.release()
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def start(host=MIRROR_HOST, port=MIRROR_PORT):
+    # Serve the mirror from a daemon thread, once per process. A port of 0
+    # (GAG_MIRROR_PORT=0) leaves it off.
+    global _server
+    if not port or _server is not None:
+        return _server
+    with _start_lock:
+        if _server is None:
+            try:
+                server = ThreadingHTTPServer((host, port), MirrorHandler)
+            except OSError as e:
+                logger.warning("Stock mirror not started on %s:%s: %s", host, port, e)
+                return None
+            server.daemon_threads = True
+            _stop.clear()
+            threading.Thread(target=server.serve_forever, name="stock-mirror", daemon=True).start()
+            logger.info("Stock mirror serving on http://%s:%s", host, port)
+            _server = server
+    return _server
+
+
+def stop():
+    global _server
+    _stop.set()
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
+
+
+def main():
+    # Run the poller and mirror without Streamlit, e.g. on a bot host
+    parser = argparse.ArgumentParser(description="Serve polled Grow a Garden stock as JSON")
+    parser.add_argument("--host", default=MIRROR_HOST)
+    parser.add_argument("--port", type=int, default=MIRROR_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if start(args.host, args.port) is None:
+        raise SystemExit(1)
+    # This module runs as __main__ here; poller importing "mirror" would load
+    # a second copy and try to bind the port again
+    poller.start(mirror=False)
+    try:
+        _stop.wait()
+    except KeyboardInterrupt:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
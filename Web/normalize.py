@@ -0,0 +1,134 @@
+import json
+import logging
+import threading
+from collections import namedtuple
+from collections.abc import Mapping
+
+# orjson decodes several times faster when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Every upstream response is decoded and validated here once per fetch, so
+# the rest of the app only ever sees these records:
+#   stock endpoints -> tuple of StockItem
+#   weather         -> Weather
+
+StockItem = namedtuple("StockItem", ["name", "quantity"])
+
+Weather = namedtuple(
+    "Weather",
+    ["name", "icon", "description", "crop_bonuses", "rarity", "last_updated", "mutations"],
+)
+
+# Weather record field -> (upstream key, value when it is missing)
+WEATHER_FIELDS = {
+    "name": ("currentWeather", "Unknown"),
+    "icon": ("icon", ""),
+    "description": ("description", "No description available"),
+    "crop_bonuses": ("cropBonuses", "Standard"),
+    "rarity": ("rarity", "Unknown"),
+    "last_updated": ("last_updated", "Unknown"),
+}
+
+WEATHER_ENDPOINT = "weather"
+
+stats = {"payloads": 0, "schema_errors": 0, "dropped_items": 0}
+_stats_lock = threading.Lock()
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _count(key, n=1):
+    with _stats_lock:
+        stats[key] += n
+
+
+def _schema_error(endpoint, message):
+    _count("schema_errors")
+    logger.warning("Unexpected %s response: %s", endpoint, message)
+    return SchemaError(f"Unexpected {endpoint} response: {message}")
+
+
+def _stock_list(endpoint, payload):
+    # Accepts [...], {"<endpoint>": [...]} and a single bare item
+    if isinstance(payload, Mapping):
+        if isinstance(payload.get(endpoint), list):
+            return payload[endpoint]
+        if "name" in payload:
+            return [payload]
+        raise _schema_error(endpoint, f"object without a {endpoint!r} list")
+    if isinstance(payload, list):
+        return payload
+    raise _schema_error(endpoint, f"expected a list, got {type(payload).__name__}")
+
+
+def _stock_item(item):
+    if not isinstance(item, Mapping):
+        return None
+    name = item.get("name")
+    if not isinstance(name, str) or not name.strip():
+        return None
+    try:
+        quantity = int(item.get("quantity") or 0)
+    except (TypeError, ValueError):
+        return None
+    return StockItem(name.strip(), max(quantity, 0))
+
+
+def normalize_stock(endpoint, payload):
+    items = []
+    dropped = 0
+    for raw in _stock_list(endpoint, payload):
+        item = _stock_item(raw)
+        if item is None:
+            dropped += 1
+        else:
+            items.append(item)
+    if dropped:
+        _count("dropped_items", dropped)
+        logger.warning("Dropped %d malformed %s item(s)", dropped, endpoint)
+    return tuple(items)
+
+
+def normalize_weather(payload):
+    if not isinstance(payload, Mapping):
+        raise _schema_error(WEATHER_ENDPOINT, f"expected an object, got {type(payload).__name__}")
+    fields = {}
+    for field, (key, default) in WEATHER_FIELDS.items():
+        value = payload.get(key)
+        fields[field] = str(value) if value not in (None, "") else default
+    mutations = payload.get("mutations") or ()
+    if isinstance(mutations, str):
+        mutations = (mutations,)
+    return Weather(mutations=tuple(str(m) for m in mutations), **fields)
+
+
+def normalize(endpoint, payload):
+    # Decoded JSON -> records. Raises SchemaError if the response has the wrong
+    # shape; malformed items in a stock list are dropped and counted.
+    _count("payloads")
+    if endpoint == WEATHER_ENDPOINT:
+        return normalize_weather(payload)
+    return normalize_stock(endpoint, payload)
+
+
+def to_payload(endpoint, records):
+    # Records back to plain JSON in the upstream's shape, for the last good
+    # files on disk and the mirror. normalize() reads it back unchanged.
+    if endpoint == WEATHER_ENDPOINT:
+        payload = {key: getattr(records, field) for field, (key, _) in WEATHER_FIELDS.items()}
+        payload["mutations"] = list(records.mutations)
+        return payload
+    return [item._asdict() for item in records]
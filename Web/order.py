@@ -1,3 +1,5 @@
+from rarity import rarity_data, TIER_RANK
+
 # Seed Order
 SEED_ORDER = [
     "Carrot",
@@ -57,3 +59,63 @@ GEAR_ORDER = [
     "Grandmaster Sprinkler",
     "Level Up Lollipop"
 ]
+
+# Cosmetic Order
+COSMETIC_ORDER = [
+    "Sign Crate",
+    "Common Gnome Crate",
+    "Fun Crate",
+    "Farmers Gnome Crate",
+    "Classic Gnome Crate",
+    "Statue Crate",
+    "Mysterious Crate"
+]
+
+# Precomputed name -> position lookups, so sorting is one dict hit per item
+SEED_RANK = {name: i for i, name in enumerate(SEED_ORDER)}
+EGG_RANK = {name: i for i, name in enumerate(EGG_ORDER)}
+GEAR_RANK = {name: i for i, name in enumerate(GEAR_ORDER)}
+COSMETIC_RANK = {name: i for i, name in enumerate(COSMETIC_ORDER)}
+
+CATEGORY_RANKS = {
+    "seeds": SEED_RANK,
+    "eggs": EGG_RANK,
+    "gear": GEAR_RANK,
+    "cosmetics": COSMETIC_RANK,
+}
+
+UNKNOWN_TIER = len(TIER_RANK)
+
+
+def _build_sort_keys(ranks):
+    # Listed items keep their order-list position. Everything else goes after
+    # them, by rarity tier and then cost.
+    unlisted = len(ranks)
+    keys = {
+        name: (unlisted, TIER_RANK.get(rarity_name, UNKNOWN_TIER), cost)
+        for name, (rarity_name, _, cost) in rarity_data.items()
+    }
+    keys.update((name, (rank, 0, 0)) for name, rank in ranks.items())
+    return keys
+
+
+# category -> {item name -> sort key}, built once so sorting is one dict hit per item
+SORT_KEYS = {category: _build_sort_keys(ranks) for category, ranks in CATEGORY_RANKS.items()}
+
+
+def name_key(category):
+    keys = SORT_KEYS.get(category, {})
+    # Items with no rarity data go last
+    unknown = (len(CATEGORY_RANKS.get(category, ())), UNKNOWN_TIER, 0)
+    return lambda name: keys.get(name, unknown)
+
+
+def sort_key(category):
+    # Key for normalize.StockItem records (anything with a .name)
+    by_name = name_key(category)
+    return lambda item: by_name(item.name)
+
+
+def sort_items(category, items):
+    # Stable, so items that tie keep the order the API returned them in
+    return sorted(items, key=sort_key(category))
@@ -0,0 +1,95 @@
+import streamlit as st
+from datetime import datetime, timezone
+import instrumentation
+import poller
+import watchlist
+from catalog import BY_CATEGORY
+from categories import CATEGORIES
+
+SINKS = {
+    "file": "Server alert log",
+    "webhook": "Webhook (POST JSON)",
+}
+
+# Query parameter holding this browser's owner token, so its subscriptions
+# survive reloads. Only the owner can see or remove them.
+OWNER_QUERY_PARAM = "watcher"
+
+st.title("🔔 Watchlist")
+st.caption("Get an alert when a watched item comes into stock, at most once per restock.")
+
+# Alerts are matched by the background poller
+poller.start()
+
+
+def format_time(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+with instrumentation.span("render", page="watchlist"):
+    if "watch_owner" not in st.session_state:
+        st.session_state.watch_owner = st.query_params.get(OWNER_QUERY_PARAM, "")
+    owner = st.session_state.watch_owner
+
+    st.subheader("Watch an item")
+    category = st.selectbox("Category", list(CATEGORIES), format_func=lambda key: CATEGORIES[key].title)
+    with st.form("watchlist_add"):
+        item = st.selectbox("Item", [entry.name for entry in BY_CATEGORY[category]])
+        sink = st.radio("Send alerts to", list(SINKS), format_func=SINKS.get, horizontal=True)
+        target = st.text_input(
+            "Webhook URL",
+            type="password",
+            help="Only for webhooks. Allowed hosts: " + (", ".join(watchlist.WEBHOOK_HOSTS) or "none"),
+        )
+        if st.form_submit_button("Watch"):
+            if not owner:
+                owner = st.session_state.watch_owner = watchlist.new_owner()
+                st.query_params[OWNER_QUERY_PARAM] = owner
+            try:
+                watchlist.subscribe(owner, item, sink, target.strip())
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.success(f"Watching {item}. Bookmark this page's address to manage your watchlist later.")
+
+    st.subheader("Your watched items")
+    subscriptions = sorted(watchlist.subscriptions(owner), key=lambda s: (s.item, s.id))
+    if not subscriptions:
+        st.info("Nothing watched yet.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Item": s.item,
+                    "Sink": SINKS.get(s.sink, s.sink),
+                    "Target": watchlist.mask_target(s.target),
+                    "Since": format_time(s.created_at),
+                }
+                for s in subscriptions
+            ],
+            hide_index=True,
+            width="stretch",
+        )
+        col_remove, col_button = st.columns([3, 1], vertical_alignment="bottom")
+        remove = col_remove.selectbox(
+            "Stop watching",
+            subscriptions,
+            format_func=lambda s: f"{s.item} → {watchlist.mask_target(s.target) or SINKS.get(s.sink, s.sink)}",
+        )
+        if col_button.button("Remove", width="stretch"):
+            watchlist.unsubscribe(owner, remove.id)
+            st.rerun()
+
+    st.subheader("Your recent alerts")
+    alerts = watchlist.recent_alerts(owner)
+    if not alerts:
+        st.write("No alerts yet.")
+    else:
+        st.dataframe(
+            [
+                {"Item": item, "Shop": CATEGORIES[endpoint].title if endpoint in CATEGORIES else endpoint, "Stock": quantity, "Seen": format_time(seen_at), "Sent to": watchlist.mask_target(target) or SINKS.get(sink, sink)}
+                for item, endpoint, quantity, seen_at, sink, target in alerts
+            ],
+            hide_index=True,
+            width="stretch",
+        )
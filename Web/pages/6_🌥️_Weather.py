@@ -1,20 +1,37 @@
 import streamlit as st
-import httpx
+import instrumentation
+import poller
 
 st.title("☀️ Weather")
 
-API_URL = "https://growagardenstock.vercel.app/api/weather"
+poller.start()
 
-with httpx.Client(timeout=10) as client:
-    resp = client.get(API_URL)
-    weather = resp.json()
+snapshot = poller.get_snapshot("weather")
+if snapshot is None:
+    error = poller.get_error("weather")
+    if error:
+        st.error(f"Failed to fetch Weather: {error}")
+    else:
+        st.info("Fetching the latest Weather, check back in a few seconds.")
+    st.stop()
 
-st.subheader(f"{weather.get('icon', '')} {weather.get('currentWeather', 'Unknown')}")
-st.write(weather.get("description", "No description available"))
-st.write(f"Effect on crops: {weather.get('cropBonuses', 'Standard')}")
-st.write(f"Rarity: {weather.get('rarity', 'Unknown')}")
-st.write(f"Last updated: {weather.get('last_updated', 'Unknown')}")
-if weather.get("mutations"):
-    st.write("Mutations available:")
-    for m in weather["mutations"]:
-        st.write(f"- {m}")
+st.caption(f"Updated {poller.format_age(poller.snapshot_age(snapshot))} ago")
+if snapshot.last_error:
+    st.warning(f"Showing the last known Weather, the latest refresh failed: {snapshot.last_error}")
+
+try:
+    weather = snapshot.data
+
+    with instrumentation.span("render", page="weather"):
+        st.subheader(f"{weather.icon} {weather.name}")
+        st.write(weather.description)
+        st.write(f"Effect on crops: {weather.crop_bonuses}")
+        st.write(f"Rarity: {weather.rarity}")
+        st.write(f"Last updated: {weather.last_updated}")
+        if weather.mutations:
+            st.write("Mutations available:")
+            for m in weather.mutations:
+                st.write(f"- {m}")
+
+except Exception as e:
+    st.error(f"Failed to render Weather: {e}")
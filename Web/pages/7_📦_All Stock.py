@@ -0,0 +1,45 @@
+import streamlit as st
+import time
+import instrumentation
+from categories import CATEGORIES
+from stock_api import fetch_many
+from stock_view import build_rows
+
+st.title("📦 All Stock")
+
+# All categories are fetched concurrently, so this takes about as long as the
+# slowest endpoint instead of the sum of all of them
+started = time.perf_counter()
+results = fetch_many(tuple(config.endpoint for config in CATEGORIES.values()))
+elapsed = time.perf_counter() - started
+st.caption(f"Fetched {len(results)} categories in {elapsed:.2f}s")
+
+for category, config in CATEGORIES.items():
+    st.subheader(config.title)
+    data = results[config.endpoint]
+
+    # A failed category is shown as degraded, the rest of the page still renders
+    if isinstance(data, Exception):
+        st.warning(f"{config.label} is unavailable right now: {data}")
+        continue
+
+    rows = build_rows(category, data)
+
+    if not rows:
+        st.write("Nothing in stock.")
+        continue
+
+    with instrumentation.span("render", page="all_stock"):
+        st.dataframe(
+            [
+                {
+                    "Item": row.name,
+                    "Stock": row.quantity,
+                    "Rarity": row.entry.rarity,
+                    "Cost (Sheckles)": row.entry.cost,
+                }
+                for row in rows
+            ],
+            hide_index=True,
+            width="stretch",
+        )
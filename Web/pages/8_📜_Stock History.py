@@ -0,0 +1,103 @@
+import streamlit as st
+import time
+from datetime import datetime, timezone
+import history
+import instrumentation
+import poller
+import predictor
+from catalog import BY_CATEGORY
+from categories import CATEGORIES
+
+WINDOWS = {
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+    "Last 30 days": 30 * 24 * 3600,
+    "All time": None,
+}
+
+st.title("📜 Stock History")
+st.caption("Every distinct stock snapshot this dashboard has seen is recorded locally.")
+
+# History is written by the background poller
+poller.start()
+
+
+def format_time(ts):
+    if ts is None:
+        return "Never"
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+with instrumentation.span("render", page="history"):
+    col_category, col_window = st.columns(2)
+    category = col_category.selectbox("Category", list(CATEGORIES), format_func=lambda key: CATEGORIES[key].title)
+    window = col_window.selectbox("Period", list(WINDOWS))
+    since = time.time() - WINDOWS[window] if WINDOWS[window] else 0
+
+    # Catalog items first, then anything else the history has seen
+    names = [entry.name for entry in BY_CATEGORY[category]]
+    total, counts = history.restock_frequency(category, since)
+    names += sorted(name for name in counts if name not in names)
+
+    st.subheader("Restock frequency")
+    if not total:
+        st.info("No stock has been recorded for this period yet.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Item": name,
+                    "Restocks seen": counts.get(name, 0),
+                    "Share of restocks": 100 * counts.get(name, 0) / total,
+                }
+                for name in names
+            ],
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Share of restocks": st.column_config.ProgressColumn("Share of restocks", format="%.0f%%", min_value=0, max_value=100),
+            },
+        )
+        st.caption(f"Based on {total} recorded restocks.")
+
+    st.subheader("Restock forecast")
+    now = time.time()
+    forecast = [p for p in predictor.predict_category(category, names, now) if p is not None]
+    if forecast:
+        next_at = forecast[0].next_restock
+        st.metric("Next restock in", poller.format_age(max(0, next_at - now)), help=f"Expected at {format_time(next_at)}")
+        forecast.sort(key=lambda p: p.probability, reverse=True)
+        st.dataframe(
+            [
+                {
+                    "Item": p.item,
+                    "Odds per restock": 100 * p.probability,
+                    "Expected by": format_time(p.expected_at),
+                    "Seen in": f"{p.cycles_seen} / {p.cycles_observed} restocks",
+                }
+                for p in forecast
+            ],
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Odds per restock": st.column_config.ProgressColumn("Odds per restock", format="%.0f%%", min_value=0, max_value=100),
+            },
+        )
+        st.caption("Odds are smoothed, so items that were never seen still show a small chance.")
+
+    st.subheader("Item lookup")
+    item = st.selectbox("Item", names)
+    if item:
+        st.write(f"Last in stock: **{format_time(history.last_in_stock(item))}**")
+        rows = history.item_history(item, since)
+        if rows:
+            st.dataframe(
+                [
+                    {"From": format_time(first_seen), "Until": format_time(last_seen), "Stock": quantity}
+                    for first_seen, last_seen, quantity in rows
+                ],
+                hide_index=True,
+                width="stretch",
+            )
+        else:
+            st.write("Not seen in this period.")
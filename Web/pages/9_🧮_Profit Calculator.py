@@ -0,0 +1,116 @@
+import streamlit as st
+import time
+import calculator
+import poller
+from instrumentation import span
+
+st.title("🧮 Profit Calculator")
+st.caption("Estimated fruit value and return on seed cost. Crop values and mutation chances are approximate community figures.")
+
+GROWTH = {"None": (0.0, 0.0), "Gold": (1.0, 0.0), "Rainbow": (0.0, 1.0)}
+
+DEFAULT_STACKS = [
+    {"Mutations": "", "Growth": "None", "Weight ×": 1.0},
+    {"Mutations": "Wet", "Growth": "None", "Weight ×": 1.0},
+    {"Mutations": "Wet, Chilled", "Growth": "Gold", "Weight ×": 1.0},
+    {"Mutations": "Shocked", "Growth": "Rainbow", "Weight ×": 2.0},
+]
+
+
+def stack_label(i, row):
+    parts = [row.get("Growth")] if row.get("Growth") in ("Gold", "Rainbow") else []
+    parts += [name.strip() for name in (row.get("Mutations") or "").split(",") if name.strip()]
+    return f"{i + 1}: {', '.join(parts) or 'Plain'} ×{row['Weight ×']:g}"
+
+
+poller.start()
+
+# The live weather goes first, and is added if the table doesn't know it
+snapshot = poller.get_snapshot("weather")
+live = snapshot.data if snapshot is not None else None
+extra = (live.name, live.mutations) if live is not None and live.name else None
+weathers, chances = calculator.weather_chances(extra)
+
+col_gold, col_rainbow, col_weight, col_harvests = st.columns(4)
+gold = col_gold.slider("Gold chance (%)", 0.0, 10.0, 1.0, 0.1) / 100
+rainbow = col_rainbow.slider("Rainbow chance (%)", 0.0, 5.0, 0.1, 0.05) / 100
+weight = col_weight.slider("Weight × base", 0.5, 5.0, 1.0, 0.1)
+harvests = col_harvests.number_input("Fruit per seed", min_value=1, value=1, step=1)
+
+default_weather = weathers.index(live.name) if extra is not None else 0
+weather = st.selectbox("Weather", weathers, index=default_weather, format_func=lambda w: f"{w} (now)" if extra and w == live.name else w)
+
+st.subheader("Custom stacks")
+st.caption("One row per fruit: comma-separated mutations, a growth mutation and its weight relative to the base weight.")
+stacks = st.data_editor(
+    DEFAULT_STACKS,
+    num_rows="dynamic",
+    width="stretch",
+    key="profit_stacks",
+    column_config={
+        "Growth": st.column_config.SelectboxColumn("Growth", options=list(GROWTH), required=True),
+        "Weight ×": st.column_config.NumberColumn("Weight ×", min_value=0.1, max_value=100.0, step=0.1),
+    },
+)
+stacks = [row for row in stacks if row.get("Weight ×")]
+
+started = time.perf_counter()
+with span("calculate", page="profit"):
+    table = calculator.TABLE
+    growth = calculator.growth_multiplier(gold, rainbow)
+    expected = calculator.expected_values(chances, growth, weight)
+    expected_roi = calculator.roi(expected, harvests)
+    singles = calculator.single_values()
+
+    stack_growth = [calculator.growth_multiplier(*GROWTH.get(row.get("Growth"), GROWTH["None"])) for row in stacks]
+    stack_weights = [row["Weight ×"] for row in stacks]
+    custom = calculator.stack_values(
+        calculator.stack_matrix([(row.get("Mutations") or "").split(",") for row in stacks]),
+        stack_growth,
+        stack_weights,
+    )
+elapsed = time.perf_counter() - started
+
+w = weathers.index(weather)
+order = expected_roi[:, w].argsort()[::-1]
+
+st.subheader(f"Expected value in {weather}")
+st.dataframe(
+    {
+        "Seed": [table.seeds[i] for i in order],
+        "Seed cost": table.costs[order],
+        "Base value": table.values[order],
+        "Expected value": expected[order, w].round(),
+        "ROI": 100 * expected_roi[order, w],
+    },
+    hide_index=True,
+    width="stretch",
+    column_config={
+        "ROI": st.column_config.NumberColumn("ROI", format="%.0f%%"),
+    },
+)
+
+st.subheader("ROI by weather")
+st.dataframe(
+    {"Seed": table.seeds, **{name: (100 * expected_roi[:, i]).round() for i, name in enumerate(weathers)}},
+    hide_index=True,
+    width="stretch",
+)
+
+if stacks:
+    st.subheader("Custom stack values")
+    labels = [stack_label(i, row) for i, row in enumerate(stacks)]
+    st.dataframe(
+        {"Seed": table.seeds, **{label: custom[:, i].round() for i, label in enumerate(labels)}},
+        hide_index=True,
+        width="stretch",
+    )
+
+with st.expander("Value with a single mutation"):
+    st.dataframe(
+        {"Seed": table.seeds, **{name: singles[:, i] for i, name in enumerate(table.mutations)}},
+        hide_index=True,
+        width="stretch",
+    )
+
+st.caption(f"Calculated {len(table.seeds)} seeds × {len(table.mutations)} mutations × {len(weathers)} weathers in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import history
+import image_cache
+import predictor
+import stock_api
+import watchlist
+from catalog import get_item
+from restock import next_restock
+
+logger = logging.getLogger(__name__)
+
+# Polls are scheduled just after each restock boundary (see restock.py).
+# Upper bound between polls, so long restock cycles still pick up late changes
+MAX_POLL_INTERVAL = 600
+
+# Give the upstream a moment to publish the new stock after a boundary
+RESTOCK_SETTLE = 5
+
+# If the first poll after a boundary still returns the old stock, look again
+RECHECK_DELAY = 20
+MAX_RECHECKS = 3
+
+RETRY_DELAY = 30
+
+# An immutable view of one endpoint's last good response.
+# data holds normalize.py records (namedtuples in a tuple), so every session
+# can share the same object without copying it.
+Snapshot = namedtuple("Snapshot", ["endpoint", "data", "fetched_at", "last_error"])
+
+_snapshots = {}
+_publish_lock = threading.Lock()
+# Bumped and notified whenever an endpoint's data changes
+_version = 0
+_changed = threading.Condition(_publish_lock)
+# endpoint -> error message, for endpoints that have never returned good data
+_first_errors = {}
+_threads = {}
+_start_lock = threading.Lock()
+_stop = threading.Event()
+
+
+def _publish(endpoint, data, error=None, fetched_at=None):
+    global _snapshots, _version
+    with _publish_lock:
+        previous = _snapshots.get(endpoint)
+        changed = False
+        if data is None:
+            # Keep serving the last good data, only record the failure
+            if previous is None:
+                _first_errors[endpoint] = error
+                return
+            snapshot = previous._replace(last_error=error)
+        else:
+            changed = previous is None or previous.data != data
+            if not changed:
+                # Unchanged stock keeps the same object, so anything cached
+                # per snapshot.data (view models, encoded bodies) stays valid
+                data = previous.data
+            snapshot = Snapshot(endpoint, data, fetched_at or time.time(), error)
+            _first_errors.pop(endpoint, None)
+
+        # Copy-on-write so readers never see a half-updated dict
+        snapshots = dict(_snapshots)
+        snapshots[endpoint] = snapshot
+        _snapshots = snapshots
+
+        if changed:
+            _version += 1
+            _changed.notify_all()
+
+
+def _warm_images(endpoint, data):
+    # Start fetching thumbnails for new stock, so pages find them cached
+    if endpoint in history.HISTORY_ENDPOINTS:
+        image_cache.warm(get_item(endpoint, item.name).image_url for item in data)
+
+
+def version():
+    return _version
+
+
+def wait_for_change(since, timeout=None):
+    # Block until the data version moves past since, or the timeout runs out.
+    # Returns the current version.
+    with _changed:
+        _changed.wait_for(lambda: _version != since, timeout)
+        return _version
+
+
+def poll(endpoint):
+    # Fetch one endpoint upstream and publish the result. Returns True if the
+    # published data changed.
+    previous = _snapshots.get(endpoint)
+    try:
+        data = stock_api.fetch(endpoint, force=True)
+    except Exception as e:
+        logger.warning("Polling %s failed: %s", endpoint, e)
+        _publish(endpoint, None, str(e))
+        raise
+    _publish(endpoint, data)
+    fetched_at = _snapshots[endpoint].fetched_at
+    try:
+        history.record(endpoint, data, fetched_at)
+        predictor.observe(endpoint, data, fetched_at)
+    except Exception as e:
+        logger.warning("Recording %s history failed: %s", endpoint, e)
+    changed = previous is None or _snapshots[endpoint].data is not previous.data
+    if changed:
+        _warm_images(endpoint, data)
+    if changed and endpoint in history.HISTORY_ENDPOINTS:
+        try:
+            watchlist.check(endpoint, previous.data if previous is not None else None, data, fetched_at)
+        except Exception as e:
+            logger.warning("Checking %s watchlist failed: %s", endpoint, e)
+    return changed
+
+
+def _run(endpoint):
+    rechecks = 0
+    at_boundary = False
+    while not _stop.is_set():
+        try:
+            changed = poll(endpoint)
+        except Exception:
+            # Don't knock on an upstream whose circuit is open
+            delay = max(RETRY_DELAY, stock_api.get_breaker(endpoint).retry_in())
+        else:
+            now = time.time()
+            if at_boundary and not changed and rechecks < MAX_RECHECKS:
+                rechecks += 1
+                delay = RECHECK_DELAY
+            else:
+                rechecks = 0
+                delay = next_restock(endpoint, now) + RESTOCK_SETTLE - now
+                at_boundary = delay <= MAX_POLL_INTERVAL
+        _stop.wait(min(max(delay, 1), MAX_POLL_INTERVAL))
+
+
+def start(mirror=True):
+    # Start one daemon thread per endpoint, once per server process.
+    # Safe to call from every page on every rerun. mirror=False leaves the
+    # JSON mirror to the caller (mirror.py's main() runs its own).
+    if len(_threads) == len(stock_api.ENDPOINTS):
+        return
+    with _start_lock:
+        _stop.clear()
+        # Serve the responses persisted by the last process until the first
+        # poll comes back, so a cold start renders straight away
+        for endpoint in stock_api.ENDPOINTS:
+            saved = stock_api.last_good(endpoint)
+            if saved is not None and endpoint not in _snapshots:
+                _publish(endpoint, saved[1], fetched_at=saved[0])
+                _warm_images(endpoint, saved[1])
+        for endpoint in stock_api.ENDPOINTS:
+            thread = _threads.get(endpoint)
+            if thread is not None and thread.is_alive():
+                continue
+            thread = threading.Thread(target=_run, args=(endpoint,), name=f"stock-poller-{endpoint}", daemon=True)
+            _threads[endpoint] = thread
+            thread.start()
+
+        # Serve the same snapshots to bots and scripts, so one upstream poll
+        # feeds every consumer (imported here, mirror depends on this module)
+        if mirror:
+            import mirror as mirror_server
+
+            mirror_server.start()
+
+
+def stop():
+    _stop.set()
+    _threads.clear()
+
+
+def get_snapshot(endpoint):
+    # O(1), never touches the network
+    return _snapshots.get(endpoint)
+
+
+def get_error(endpoint):
+    # Latest failure for an endpoint, whether or not a snapshot exists yet
+    snapshot = _snapshots.get(endpoint)
+    if snapshot is not None:
+        return snapshot.last_error
+    return _first_errors.get(endpoint)
+
+
+def snapshot_age(snapshot, now=None):
+    if now is None:
+        now = time.time()
+    return max(0.0, now - snapshot.fetched_at)
+
+
+def format_age(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
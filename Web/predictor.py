@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import namedtuple
+
+import history
+from catalog import BY_NAME
+from restock import RESTOCK_INTERVALS
+
+# Per-item restock odds, updated incrementally from stock snapshots.
+#
+# Each endpoint restocks on fixed wall-clock boundaries (see restock.py), the
+# same cycles history.restock_frequency counts. A cycle counts as observed once
+# any snapshot lands in it, and an item is counted once per observed cycle it
+# was in stock for, so every new snapshot costs O(items in it) and the full
+# history is only read once at startup.
+
+Prediction = namedtuple(
+    "Prediction",
+    ["item", "endpoint", "probability", "cycles_seen", "cycles_observed", "next_restock", "expected_at"],
+)
+
+
+class _EndpointModel:
+    def __init__(self, interval):
+        self.interval = interval
+        self.cycles_observed = 0
+        self.last_cycle = None
+        self.item_cycles = {}
+        self.item_last_cycle = {}
+
+    def cycle_of(self, ts):
+        return int(ts // self.interval)
+
+    def add_cycle(self, cycle, names):
+        if self.last_cycle is None or cycle > self.last_cycle:
+            self.cycles_observed += 1
+            self.last_cycle = cycle
+        elif cycle < self.last_cycle:
+            return
+        for name in names:
+            if self.item_last_cycle.get(name, cycle - 1) < cycle:
+                self.item_cycles[name] = self.item_cycles.get(name, 0) + 1
+                self.item_last_cycle[name] = cycle
+
+    def next_boundary(self, now):
+        return (self.cycle_of(now) + 1) * self.interval
+
+
+_models = {}
+_lock = threading.Lock()
+_loaded = False
+
+
+def _model(endpoint):
+    model = _models.get(endpoint)
+    if model is None:
+        model = _models[endpoint] = _EndpointModel(RESTOCK_INTERVALS[endpoint])
+    return model
+
+
+def load():
+    # Replay the recorded history once. A stored snapshot covers every cycle
+    # between its first and last sighting.
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        conn = history.connect()
+        rows = conn.execute(
+            """
+            SELECT s.id, s.endpoint, s.first_seen, s.last_seen, st.item FROM snapshots s
+            LEFT JOIN stock st ON st.snapshot_id = s.id AND st.quantity > 0
+            ORDER BY s.first_seen, s.id
+            """
+        )
+        current = None
+        names = []
+        for snapshot_id, endpoint, first_seen, last_seen, item in rows:
+            if current is not None and current[0] != snapshot_id:
+                _replay(*current[1:], names)
+                names = []
+            current = (snapshot_id, endpoint, first_seen, last_seen)
+            if item is not None:
+                names.append(item)
+        if current is not None:
+            _replay(*current[1:], names)
+        _loaded = True
+
+
+def _replay(endpoint, first_seen, last_seen, names):
+    if endpoint not in RESTOCK_INTERVALS:
+        return
+    model = _model(endpoint)
+    for cycle in range(model.cycle_of(first_seen), model.cycle_of(last_seen) + 1):
+        model.add_cycle(cycle, names)
+
+
+def observe(endpoint, records, seen_at=None):
+    # Feed one polled snapshot
+    if endpoint not in history.HISTORY_ENDPOINTS:
+        return
+    if seen_at is None:
+        seen_at = time.time()
+    load()
+    names = [item.name for item in records if item.quantity > 0]
+    with _lock:
+        model = _model(endpoint)
+        model.add_cycle(model.cycle_of(seen_at), names)
+
+
+def _endpoint_for(item):
+    entry = BY_NAME.get(item)
+    if entry is not None:
+        return entry.category
+    for endpoint, model in _models.items():
+        if item in model.item_cycles:
+            return endpoint
+    return None
+
+
+def next_restock(endpoint, now=None):
+    if now is None:
+        now = time.time()
+    load()
+    with _lock:
+        return _model(endpoint).next_boundary(now)
+
+
+def predict(item, endpoint=None, now=None):
+    # Odds of the item being in any one restock, and when it is expected next.
+    # Returns None if the item's category is unknown.
+    if now is None:
+        now = time.time()
+    load()
+    endpoint = endpoint or _endpoint_for(item)
+    if endpoint not in RESTOCK_INTERVALS:
+        return None
+
+    with _lock:
+        model = _model(endpoint)
+        seen = model.item_cycles.get(item, 0)
+        observed = model.cycles_observed
+        next_at = model.next_boundary(now)
+        interval = model.interval
+
+    # Laplace smoothing keeps unseen items above zero and new data from
+    # swinging the odds to 0% or 100%
+    probability = (seen + 1) / (observed + 2)
+    expected_at = next_at + (1 / probability - 1) * interval
+    return Prediction(item, endpoint, probability, seen, observed, next_at, expected_at)
+
+
+def predict_category(endpoint, names, now=None):
+    return [predict(name, endpoint, now) for name in names]
@@ -1,7 +1,21 @@
-# Rarity mapping: item_name -> (rarity_name, rarity_icon_file, sheckle_cost)
+# Rarity tiers from lowest to highest, used as a sort fallback for unlisted items
+RARITY_TIERS = [
+    "Common",
+    "Uncommon",
+    "Rare",
+    "Legendary",
+    "Mythical",
+    "Divine",
+    "Prismatic",
+    "Transcendent",
+    "Special",
+]
 
-rarity_data = {
-    # Seeds
+TIER_RANK = {tier: i for i, tier in enumerate(RARITY_TIERS)}
+
+# Rarity mapping per shop category: item_name -> (rarity_name, rarity_icon_file, sheckle_cost)
+
+SEED_RARITY = {
     "Carrot": ("Common", "CommonTier.jpg", 10),
     "Strawberry": ("Common", "CommonTier.jpg", 50),
     "Blueberry": ("Uncommon", "UncommonIcon.png", 400),
@@ -28,16 +42,18 @@ rarity_data = {
     "Giant Pinecone": ("Prismatic", "PrismaticTier.gif", 55000000),
     "Elder Strawberry": ("Prismatic", "PrismaticTier.gif", 70000000),
     "Romanesco": ("Prismatic", "PrismaticTier.gif", 88000000), # Corrected cost
+}
 
-    # Eggs
+EGG_RARITY = {
     "Common Egg": ("Common", "CommonTier.jpg", 50000),
     "Uncommon Egg": ("Uncommon", "UncommonIcon.png", 150000),
     "Rare Egg": ("Rare", "RareIcon.png", 600000),
     "Legendary Egg": ("Legendary", "LegendaryIcon.png", 3000000),
     "Mythical Egg": ("Mythical", "Mythical_Icon.png", 8000000),
     "Bug Egg": ("Special", "Divine.png", 50000000),
+}
 
-    # Gear
+GEAR_RARITY = {
     "Watering Can": ("Rare", "RareIcon.png", 50000),
     "Trowel": ("Rare", "RareIcon.png", 100000),
     "Trading Ticket": ("Uncommon", "UncommonIcon.png", 100000),
@@ -56,3 +72,13 @@ rarity_data = {
     "Medium Toy": ("Uncommon", "UncommonIcon.png", 4000000),
     "Level Up Lollipop": ("Rare", "RareIcon.png", 10000000000),
 }
+
+CATEGORY_RARITY = {
+    "seeds": SEED_RARITY,
+    "eggs": EGG_RARITY,
+    "gear": GEAR_RARITY,
+    "cosmetics": {},
+}
+
+# Flat lookup across every category
+rarity_data = {**SEED_RARITY, **EGG_RARITY, **GEAR_RARITY}
@@ -0,0 +1,40 @@
+import random
+import time
+
+# Restock cadence (seconds) per endpoint. The game restocks on wall-clock
+# boundaries: every multiple of the interval since the Unix epoch.
+RESTOCK_INTERVALS = {
+    "seeds": 300,
+    "gear": 300,
+    "eggs": 1800,
+    "cosmetics": 14400,
+    "weather": 300,
+}
+
+DEFAULT_INTERVAL = 600
+
+
+def next_restock(endpoint, now=None):
+    # Wall-clock time of the next restock boundary for an endpoint
+    if now is None:
+        now = time.time()
+    interval = RESTOCK_INTERVALS.get(endpoint, DEFAULT_INTERVAL)
+    return (now // interval + 1) * interval
+
+
+def last_restock(endpoint, now=None):
+    if now is None:
+        now = time.time()
+    return next_restock(endpoint, now) - RESTOCK_INTERVALS.get(endpoint, DEFAULT_INTERVAL)
+
+
+def next_refresh(endpoint, delay, jitter=0, now=None):
+    # When a page should pick up new stock: delay seconds after a restock
+    # boundary, plus up to jitter seconds so sessions spread out. If the last
+    # boundary's refresh is still ahead, that one comes first.
+    if now is None:
+        now = time.time()
+    boundary = last_restock(endpoint, now)
+    if now >= boundary + delay:
+        boundary = next_restock(endpoint, now)
+    return boundary + delay + random.uniform(0, jitter)
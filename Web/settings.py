@@ -0,0 +1,26 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Data worth keeping across restarts: stock history, last good responses
+DATA_DIR = os.environ.get("GAG_DATA_DIR", os.path.join(BASE_DIR, ".data"))
+
+# Disposable caches that can be rebuilt from upstream: image thumbnails
+CACHE_DIR = os.environ.get("GAG_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+# JSON mirror of the polled stock for bots and scripts (see mirror.py).
+# GAG_MIRROR_PORT=0 turns it off.
+MIRROR_HOST = os.environ.get("GAG_MIRROR_HOST", "127.0.0.1")
+MIRROR_PORT = int(os.environ.get("GAG_MIRROR_PORT", "8502"))
+
+# Stock cache shared between server processes (see shared_cache.py), e.g.
+# "sqlite" or "redis://127.0.0.1:6379/0". Empty keeps the cache per process.
+SHARED_CACHE = os.environ.get("GAG_SHARED_CACHE", "")
+
+# Hosts the watchlist's webhook sink may POST to (see watchlist.py), comma
+# separated; subdomains are included. Empty turns the webhook sink off.
+WEBHOOK_HOSTS = tuple(
+    host.strip().lower()
+    for host in os.environ.get("GAG_WEBHOOK_HOSTS", "discord.com,discordapp.com,hooks.slack.com").split(",")
+    if host.strip()
+)
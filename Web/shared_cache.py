@@ -0,0 +1,322 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.parse import unquote, urlsplit
+
+from settings import DATA_DIR
+
+# Stock cache shared by several server processes (replicas behind a load
+# balancer), so they make one upstream request per endpoint per TTL between
+# them and serve the same snapshot. Two backends with the same methods:
+#
+#   SQLiteCache - a SQLite file, for processes on one host
+#   RedisCache  - any server speaking the Redis protocol (RESP)
+#
+#   get(endpoint)                   -> Entry or None
+#   put(endpoint, payload, ttl)     -> Entry with the next version
+#   acquire(endpoint, token, ttl)   -> True if this token now holds the lock
+#   release(endpoint, token)
+#
+# Only the lock holder refreshes an endpoint (single flight); the others wait
+# for the version to move. Payloads are the upstream-shaped JSON text from
+# normalize.to_payload(). Times are wall clock, since replicas share no
+# monotonic clock.
+
+# version increases by one on every put for an endpoint
+Entry = namedtuple("Entry", ["version", "fetched_at", "expires_at", "payload"])
+
+DEFAULT_SQLITE_PATH = os.path.join(DATA_DIR, "shared_cache.sqlite3")
+
+REDIS_PORT = 6379
+KEY_PREFIX = "gag"
+SOCKET_TIMEOUT = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    endpoint TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS locks (
+    endpoint TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SharedCacheError(Exception):
+    pass
+
+
+class SQLiteCache:
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"SQLiteCache({self.path!r})"
+
+    def _connect(self):
+        # One connection per thread, autocommit so BEGIN IMMEDIATE is explicit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                with self._schema_lock:
+                    conn.executescript(SCHEMA)
+                self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # Takes the database write lock up front, so read-then-write steps
+        # can't interleave between processes
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise SharedCacheError(f"shared cache {self.path}: {e}") from e
+
+    def get(self, endpoint):
+        try:
+            row = self._connect().execute(
+                "SELECT version, fetched_at, expires_at, payload FROM entries WHERE endpoint = ?",
+                (endpoint,),
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise SharedCacheError(f"shared cache {self.path}: {e}") from e
+        return Entry(*row) if row else None
+
+    def put(self, endpoint, payload, ttl):
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT version FROM entries WHERE endpoint = ?", (endpoint,)).fetchone()
+            entry = Entry((row[0] if row else 0) + 1, now, now + ttl, payload)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (endpoint, version, fetched_at, expires_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (endpoint, *entry),
+            )
+        return entry
+
+    def acquire(self, endpoint, token, ttl):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM locks WHERE endpoint = ? AND expires_at <= ?", (endpoint, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO locks (endpoint, token, expires_at) VALUES (?, ?, ?)",
+                (endpoint, token, now + ttl),
+            )
+            return cur.rowcount == 1
+
+    def release(self, endpoint, token):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM locks WHERE endpoint = ? AND token = ?", (endpoint, token))
+
+
+class RedisError(SharedCacheError):
+    pass
+
+
+class RedisClient:
+    # Just enough RESP2 for RedisCache: one connection, one command at a time
+
+    def __init__(self, host="127.0.0.1", port=REDIS_PORT, db=0, password=None, timeout=SOCKET_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._file = None
+
+    @staticmethod
+    def _encode(args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self):
+        line = self._file.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by the server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise RedisError(rest.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self._file.read(size + 2)
+            if len(data) != size + 2:
+                raise ConnectionError("connection closed by the server")
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            if size < 0:
+                return None
+            replies = []
+            for _ in range(size):
+                # Errors inside a reply (EXEC) are returned, not raised
+                try:
+                    replies.append(self._read())
+                except RedisError as e:
+                    replies.append(e)
+            return replies
+        raise RedisError(f"unexpected reply {line!r}")
+
+    def _call(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read()
+
+    def execute(self, *args):
+        # Run one command, reconnecting once if the connection went away
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._open()
+                    return self._call(*args)
+                except OSError as e:
+                    self.close()
+                    if attempt == 2:
+                        raise SharedCacheError(f"redis {self.host}:{self.port}: {e}") from e
+
+    def transaction(self, *commands):
+        # MULTI ... EXEC as one round of writes; returns the EXEC replies
+        with self._lock:
+            if self._sock is None:
+                try:
+                    self._open()
+                except OSError as e:
+                    self.close()
+                    raise SharedCacheError(f"redis {self.host}:{self.port}: {e}") from e
+            try:
+                self._sock.sendall(b"".join(self._encode(args) for args in (("MULTI",), *commands, ("EXEC",))))
+                for _ in range(len(commands) + 1):
+                    self._read()
+                return self._read()
+            except OSError as e:
+                self.close()
+                raise SharedCacheError(f"redis {self.host}:{self.port}: {e}") from e
+            except RedisError:
+                self.close()
+                raise
+
+
+class RedisCache:
+    # Keys, per endpoint:
+    #   gag:entry:<endpoint>    JSON {fetched_at, expires_at, payload}
+    #   gag:version:<endpoint>  integer, INCR'd together with the entry write
+    #   gag:lock:<endpoint>     token of the replica refreshing it (SET NX PX)
+
+    def __init__(self, client, prefix=KEY_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    def __repr__(self):
+        return f"RedisCache({self.client.host}:{self.client.port}/{self.client.db})"
+
+    def _key(self, kind, endpoint):
+        return f"{self.prefix}:{kind}:{endpoint}"
+
+    def get(self, endpoint):
+        version, raw = self.client.execute("MGET", self._key("version", endpoint), self._key("entry", endpoint))
+        if version is None or raw is None:
+            return None
+        try:
+            entry = json.loads(raw)
+            return Entry(int(version), float(entry["fetched_at"]), float(entry["expires_at"]), entry["payload"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise SharedCacheError(f"unreadable shared {endpoint} entry: {e}") from e
+
+    def put(self, endpoint, payload, ttl):
+        now = time.time()
+        raw = json.dumps({"fetched_at": now, "expires_at": now + ttl, "payload": payload})
+        replies = self.client.transaction(
+            ("INCR", self._key("version", endpoint)),
+            ("SET", self._key("entry", endpoint), raw),
+        )
+        if not replies or isinstance(replies[0], Exception):
+            raise RedisError(f"writing shared {endpoint} entry failed: {replies!r}")
+        return Entry(replies[0], now, now + ttl, payload)
+
+    def acquire(self, endpoint, token, ttl):
+        reply = self.client.execute("SET", self._key("lock", endpoint), token, "NX", "PX", max(1, int(ttl * 1000)))
+        return reply == "OK"
+
+    def release(self, endpoint, token):
+        # Check then delete: not atomic, but a lock that expired and was taken
+        # over in between would only make one extra replica refresh early
+        key = self._key("lock", endpoint)
+        if self.client.execute("GET", key) == token.encode("utf-8"):
+            self.client.execute("DEL", key)
+
+
+def open_cache(url):
+    # Backend for a GAG_SHARED_CACHE value, or None when it is empty:
+    #   sqlite                      DEFAULT_SQLITE_PATH
+    #   sqlite:///path/to/file      that file
+    #   redis://[:password@]host[:port][/db]
+    if not url:
+        return None
+    if url in ("sqlite", "sqlite://"):
+        return SQLiteCache()
+    parts = urlsplit(url)
+    if parts.scheme == "sqlite":
+        return SQLiteCache(unquote(parts.path) or DEFAULT_SQLITE_PATH)
+    if parts.scheme == "redis":
+        db = parts.path.strip("/")
+        client = RedisClient(
+            host=parts.hostname or "127.0.0.1",
+            port=parts.port or REDIS_PORT,
+            db=int(db) if db else 0,
+            password=unquote(parts.password) if parts.password else None,
+        )
+        return RedisCache(client)
+    raise ValueError(f"Unsupported shared cache URL: {url!r}")
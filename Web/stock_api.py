@@ -0,0 +1,554 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import instrumentation
+import normalize
+import shared_cache
+from settings import DATA_DIR, SHARED_CACHE
+
+logger = logging.getLogger(__name__)
+
+# Upstream endpoints, keyed by the name the pages ask for. The environment
+# can point them elsewhere, e.g. at benchmarks/fake_upstream.py.
+API_BASE_URL = os.environ.get("GAG_API_BASE", "https://gagapi.onrender.com").rstrip("/")
+WEATHER_URL = os.environ.get("GAG_WEATHER_URL", "https://growagardenstock.vercel.app/api/weather")
+
+ENDPOINTS = {
+    "seeds": f"{API_BASE_URL}/seeds",
+    "eggs": f"{API_BASE_URL}/eggs",
+    "gear": f"{API_BASE_URL}/gear",
+    "cosmetics": f"{API_BASE_URL}/cosmetics",
+    "weather": WEATHER_URL,
+}
+
+# How long (seconds) a response is reused before going upstream again.
+# Seeds/gear restock every 5 minutes, eggs every 30, cosmetics every 4 hours.
+DEFAULT_TTL = 60
+CACHE_TTLS = {
+    "seeds": 60,
+    "eggs": 120,
+    "gear": 60,
+    "cosmetics": 300,
+    "weather": 60,
+}
+
+REQUEST_TIMEOUT = 10
+
+# Per-endpoint timeout budget for the concurrent fan-out in fetch_many(), so
+# one slow endpoint cannot hold the others' results for the full
+# REQUEST_TIMEOUT. Cosmetics has the largest payload and gets the most.
+ENDPOINT_TIMEOUTS = {
+    "seeds": 5,
+    "eggs": 5,
+    "gear": 5,
+    "cosmetics": 8,
+    "weather": 5,
+}
+
+# The four shop categories, in the order the dashboard shows them
+CATEGORY_ENDPOINTS = ("seeds", "eggs", "gear", "cosmetics")
+
+# Last good response per endpoint, so a fresh process can render straight away
+LAST_GOOD_DIR = os.path.join(DATA_DIR, "last_good")
+
+# Circuit breaker settings, shared by every upstream host
+FAILURE_THRESHOLD = 3
+BASE_BACKOFF = 5
+MAX_BACKOFF = 300
+
+# One pooled keep-alive client shared by every session in this server process
+_client = None
+_client_lock = threading.Lock()
+
+# endpoint -> (expires_at, records). Expired entries are kept and served stale.
+# Responses are decoded and validated by normalize.py before they are cached.
+_cache = {}
+# endpoint -> _InFlight for requests currently on the wire
+_in_flight = {}
+_cache_lock = threading.Lock()
+
+# endpoint -> (saved_at, records) loaded from / written to LAST_GOOD_DIR
+_last_good = {}
+
+# upstream host -> CircuitBreaker
+_breakers = {}
+
+# Cache shared with the other server processes (see shared_cache.py), or None.
+# A forced fetch (the poller) reuses a shared entry up to SHARED_FORCE_WINDOW
+# seconds old, so replicas polling the same restock share one request.
+_shared = shared_cache.open_cache(SHARED_CACHE)
+SHARED_FORCE_WINDOW = 15
+# The lock outlives a slow request, and waiters give up after the lock would
+# have expired and fetch for themselves
+SHARED_LOCK_TTL = REQUEST_TIMEOUT + 5
+SHARED_LOCK_WAIT = SHARED_LOCK_TTL + 1
+SHARED_POLL_INTERVAL = 0.1
+# endpoint -> (version, records) last read from the shared cache
+_shared_records = {}
+
+stats = {
+    "hits": 0,
+    "stale_hits": 0,
+    "misses": 0,
+    "errors": 0,
+    "upstream_calls": 0,
+    "rejected": 0,
+    "shared_hits": 0,
+    "shared_errors": 0,
+}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    # closed: requests flow. open: requests are rejected until the backoff
+    # runs out. half_open: a single probe request decides which way to go.
+    # Every consecutive trip doubles the backoff, up to max_backoff.
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.open_until:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trips = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.trips += 1
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.trips - 1))
+                self.open_until = time.monotonic() + backoff
+                self.state = self.OPEN
+                logger.warning("Circuit for %s opened for %ss", self.name, backoff)
+
+    def retry_in(self):
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.open_until - time.monotonic())
+
+
+class _InFlight:
+    # A single upstream request that concurrent callers wait on
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.payload = None
+        self.error = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # httpx (with certifi) is a noticeable share of a cold start, so
+                # it is imported by the first request, on a poller thread
+                import httpx
+
+                _client = httpx.Client(
+                    timeout=REQUEST_TIMEOUT,
+                    limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60),
+                )
+    return _client
+
+
+def set_ttl(endpoint, seconds):
+    CACHE_TTLS[endpoint] = seconds
+
+
+def _get_url(endpoint):
+    try:
+        return ENDPOINTS[endpoint]
+    except KeyError:
+        raise ValueError(f"Unknown stock endpoint: {endpoint!r}") from None
+
+
+def get_breaker(endpoint):
+    host = urlsplit(_get_url(endpoint)).netloc
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _cache_lock:
+            breaker = _breakers.setdefault(host, CircuitBreaker(host))
+    return breaker
+
+
+def _check_breaker(endpoint):
+    breaker = get_breaker(endpoint)
+    if not breaker.allow():
+        with _cache_lock:
+            stats["rejected"] += 1
+        raise CircuitOpenError(f"{breaker.name} is unavailable, retrying in {breaker.retry_in():.0f}s")
+    return breaker
+
+
+def _request(endpoint):
+    with _cache_lock:
+        stats["upstream_calls"] += 1
+    with instrumentation.span("fetch", endpoint=endpoint):
+        resp = get_client().get(_get_url(endpoint))
+        resp.raise_for_status()
+    with instrumentation.span("parse", endpoint=endpoint):
+        return normalize.normalize(endpoint, normalize.loads(resp.content))
+
+
+def _request_guarded(endpoint):
+    breaker = _check_breaker(endpoint)
+    try:
+        records = _request(endpoint)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return records
+
+
+def _shared_usable(entry, force, now):
+    if entry is None:
+        return False
+    if force:
+        return entry.fetched_at >= now - SHARED_FORCE_WINDOW
+    return entry.expires_at > now
+
+
+def _use_shared(endpoint, entry):
+    # Records for a shared entry, decoded once per version
+    seen = _shared_records.get(endpoint)
+    if seen is not None and seen[0] == entry.version:
+        records = seen[1]
+    else:
+        with instrumentation.span("parse", endpoint=endpoint):
+            records = normalize.normalize(endpoint, normalize.loads(entry.payload))
+        _shared_records[endpoint] = (entry.version, records)
+        _save_last_good(endpoint, records)
+    with _cache_lock:
+        # Expire together with the shared entry, so replicas refresh as one
+        _cache[endpoint] = (time.monotonic() + entry.expires_at - time.time(), records)
+    return records
+
+
+def _publish_shared(endpoint, records):
+    payload = json.dumps(normalize.to_payload(endpoint, records), separators=(",", ":"))
+    entry = _shared.put(endpoint, payload, CACHE_TTLS.get(endpoint, DEFAULT_TTL))
+    _shared_records[endpoint] = (entry.version, records)
+    _save_last_good(endpoint, records)
+    return _use_shared(endpoint, entry)
+
+
+def _fetch_shared(endpoint, force):
+    # Use another replica's response when it is recent enough. Otherwise take
+    # the endpoint's lock and go upstream, or wait for whoever holds it.
+    started = time.time()
+    token = os.urandom(8).hex()
+    deadline = time.monotonic() + SHARED_LOCK_WAIT
+    while time.monotonic() < deadline:
+        entry = _shared.get(endpoint)
+        if _shared_usable(entry, force, started):
+            with _cache_lock:
+                stats["shared_hits"] += 1
+            return _use_shared(endpoint, entry)
+        if _shared.acquire(endpoint, token, SHARED_LOCK_TTL):
+            try:
+                # The previous holder may have finished since the check above
+                entry = _shared.get(endpoint)
+                if _shared_usable(entry, force, started):
+                    with _cache_lock:
+                        stats["shared_hits"] += 1
+                    return _use_shared(endpoint, entry)
+                return _publish_shared(endpoint, _request_guarded(endpoint))
+            finally:
+                _shared.release(endpoint, token)
+        time.sleep(SHARED_POLL_INTERVAL)
+
+    logger.warning("Timed out waiting for the shared %s refresh, fetching it here", endpoint)
+    return _publish_shared(endpoint, _request_guarded(endpoint))
+
+
+def _refresh(endpoint, force):
+    if _shared is not None:
+        try:
+            return _fetch_shared(endpoint, force)
+        except shared_cache.SharedCacheError as e:
+            # Carry on per process while the shared cache is unreachable
+            with _cache_lock:
+                stats["shared_errors"] += 1
+            logger.warning("Shared cache unavailable for %s: %s", endpoint, e)
+    records = _request_guarded(endpoint)
+    _store(endpoint, records)
+    return records
+
+
+def _fetch_upstream(endpoint, force=False):
+    # Concurrent callers for the same endpoint share one upstream request
+    with _cache_lock:
+        flight = _in_flight.get(endpoint)
+        leader = flight is None
+        if leader:
+            flight = _InFlight()
+            _in_flight[endpoint] = flight
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.payload
+
+    try:
+        flight.payload = _refresh(endpoint, force)
+    except Exception as e:
+        with _cache_lock:
+            stats["errors"] += 1
+        flight.error = e
+        raise
+    else:
+        return flight.payload
+    finally:
+        with _cache_lock:
+            _in_flight.pop(endpoint, None)
+        flight.done.set()
+
+
+def _revalidate(endpoint):
+    try:
+        _fetch_upstream(endpoint)
+    except Exception as e:
+        logger.info("Background refresh of %s failed: %s", endpoint, e)
+
+
+def _revalidate_in_background(endpoint):
+    if endpoint in _in_flight:
+        return
+    threading.Thread(target=_revalidate, args=(endpoint,), name=f"stock-revalidate-{endpoint}", daemon=True).start()
+
+
+def fetch(endpoint, force=False):
+    # Returns the normalized records for an endpoint, from cache while it is fresh.
+    # Once the TTL runs out the stale value is still returned immediately and
+    # refreshed in the background; only a cold cache waits on the upstream.
+    # force=True always goes upstream (and raises if that fails).
+    _get_url(endpoint)
+    now = time.monotonic()
+
+    with _cache_lock:
+        cached = _cache.get(endpoint)
+        if not force and cached is not None:
+            if cached[0] > now:
+                stats["hits"] += 1
+            else:
+                stats["stale_hits"] += 1
+        else:
+            stats["misses"] += 1
+
+    if force or cached is None:
+        return _fetch_upstream(endpoint, force)
+    if cached[0] <= now:
+        _revalidate_in_background(endpoint)
+    return cached[1]
+
+
+def _store(endpoint, records):
+    ttl = CACHE_TTLS.get(endpoint, DEFAULT_TTL)
+    with _cache_lock:
+        _cache[endpoint] = (time.monotonic() + ttl, records)
+    _save_last_good(endpoint, records)
+
+
+def _save_last_good(endpoint, records):
+    saved_at = time.time()
+    _last_good[endpoint] = (saved_at, records)
+    payload = normalize.to_payload(endpoint, records)
+    path = os.path.join(LAST_GOOD_DIR, f"{endpoint}.json")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(LAST_GOOD_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": saved_at, "payload": payload}, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Could not persist last good %s response: %s", endpoint, e)
+
+
+def _load_last_good():
+    # Prime the cache with stale entries, so the first request after a restart
+    # is served from disk while the upstream is woken up in the background
+    for endpoint in ENDPOINTS:
+        path = os.path.join(LAST_GOOD_DIR, f"{endpoint}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            _last_good[endpoint] = (float(saved["saved_at"]), normalize.normalize(endpoint, saved["payload"]))
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable last good %s response: %s", endpoint, e)
+            continue
+        _cache.setdefault(endpoint, (0.0, _last_good[endpoint][1]))
+
+
+def last_good(endpoint):
+    # (saved_at wall-clock time, records) of the newest good response, or None
+    return _last_good.get(endpoint)
+
+
+async def _fetch_async(client, endpoint):
+    breaker = _check_breaker(endpoint)
+    timeout = ENDPOINT_TIMEOUTS.get(endpoint, REQUEST_TIMEOUT)
+    with _cache_lock:
+        stats["upstream_calls"] += 1
+    try:
+        with instrumentation.span("fetch", endpoint=endpoint):
+            resp = await asyncio.wait_for(client.get(_get_url(endpoint)), timeout)
+            resp.raise_for_status()
+        with instrumentation.span("parse", endpoint=endpoint):
+            records = normalize.normalize(endpoint, normalize.loads(resp.content))
+    except Exception:
+        breaker.record_failure()
+        with _cache_lock:
+            stats["errors"] += 1
+        raise
+    breaker.record_success()
+    _store(endpoint, records)
+    return records
+
+
+def _settle(future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _in_thread(func, *args, name="stock-fetch"):
+    # Like asyncio.to_thread, but on a daemon thread: asyncio.run() waits for
+    # the default executor on shutdown, which would hold fetch_many() until a
+    # call that already timed out finally returned
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def run():
+        result = error = None
+        try:
+            result = func(*args)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(_settle, future, result, error)
+        except RuntimeError:
+            # The loop is closed: the caller stopped waiting long ago
+            pass
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
+
+
+async def fetch_many_async(endpoints=CATEGORY_ENDPOINTS):
+    # Fetch every endpoint concurrently. Cached entries are served as-is (stale
+    # ones are refreshed in the background), the rest go upstream in parallel,
+    # each with its own timeout budget.
+    # Returns {endpoint: records or Exception} so one failure does not sink the rest.
+    results = {}
+    missing = []
+    stale = []
+    now = time.monotonic()
+    with _cache_lock:
+        for endpoint in endpoints:
+            cached = _cache.get(endpoint)
+            if cached is None:
+                stats["misses"] += 1
+                missing.append(endpoint)
+                continue
+            if cached[0] > now:
+                stats["hits"] += 1
+            else:
+                stats["stale_hits"] += 1
+                stale.append(endpoint)
+            results[endpoint] = cached[1]
+
+    for endpoint in stale:
+        _revalidate_in_background(endpoint)
+
+    if missing and _shared is not None:
+        # Replicas coordinate through the shared cache, which blocks. Waiting
+        # on another replica's fetch counts against the same budget; a fetch
+        # that runs over still finishes in its thread and fills the cache.
+        fetched = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    _in_thread(_fetch_upstream, endpoint, name=f"stock-fetch-{endpoint}"),
+                    ENDPOINT_TIMEOUTS.get(endpoint, REQUEST_TIMEOUT),
+                )
+                for endpoint in missing
+            ),
+            return_exceptions=True,
+        )
+        results.update(zip(missing, fetched))
+    elif missing:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+            fetched = await asyncio.gather(
+                *(_fetch_async(client, endpoint) for endpoint in missing),
+                return_exceptions=True,
+            )
+        results.update(zip(missing, fetched))
+
+    return {endpoint: results[endpoint] for endpoint in endpoints}
+
+
+def fetch_many(endpoints=CATEGORY_ENDPOINTS):
+    return asyncio.run(fetch_many_async(endpoints))
+
+
+def invalidate(endpoint=None):
+    with _cache_lock:
+        if endpoint is None:
+            _cache.clear()
+        else:
+            _cache.pop(endpoint, None)
+
+
+def cache_stats():
+    total = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    return {
+        **stats,
+        "hit_rate": (stats["hits"] + stats["stale_hits"]) / total if total else 0.0,
+        "cached_endpoints": sorted(_cache),
+        "breakers": {name: breaker.state for name, breaker in _breakers.items()},
+        "shared_cache": repr(_shared) if _shared is not None else None,
+        "shared_versions": {endpoint: seen[0] for endpoint, seen in _shared_records.items()},
+    }
+
+
+_load_last_good()
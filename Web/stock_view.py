@@ -0,0 +1,289 @@
+import json
+import threading
+import time
+from collections import namedtuple
+
+import pyarrow as pa
+import streamlit as st
+
+import image_cache
+import instrumentation
+import poller
+import restock
+from catalog import get_item
+from categories import CATEGORIES
+from order import sort_items
+
+# Session flag set from the settings dialog in Welcome.py
+COMPACT_MODE_KEY = "compact_mode"
+
+# What one stock row needs to render: the API name and quantity plus its
+# catalog record (rarity, cost, image URL)
+ItemView = namedtuple("ItemView", ["name", "quantity", "entry"])
+
+# Keyed difference between two row lists: names added, removed, and
+# {name: old quantity} for rows whose quantity changed
+StockDiff = namedtuple("StockDiff", ["added", "removed", "changed"])
+
+# How long a new or changed row stays highlighted
+HIGHLIGHT_SECONDS = 90
+
+# Session flag for refreshing the stock pages on the restock clock
+AUTO_REFRESH_KEY = "auto_refresh"
+# Seconds after a restock boundary before a page refreshes: the poller waits
+# RESTOCK_SETTLE and then needs a round trip upstream to publish new stock
+AUTO_REFRESH_DELAY = 15
+# Extra random delay per session, so sessions do not all rerun at once
+AUTO_REFRESH_JITTER = 15
+
+# Rolls over to the following restock at each boundary, like
+# export_static.COUNTDOWN_SCRIPT, so it keeps counting without a rerun
+COUNTDOWN_HTML = """
+<div id="countdown" style="font-family: sans-serif; font-size: 14px; color: #808495;"></div>
+<script>
+const interval = {interval};
+const label = {label};
+const el = document.getElementById("countdown");
+function tick() {{
+    const now = Date.now() / 1000;
+    const left = Math.ceil((Math.floor(now / interval) + 1) * interval - now);
+    const minutes = Math.floor(left / 60);
+    const seconds = String(left % 60).padStart(2, "0");
+    el.textContent = `⏱️ Next ${{label}} restock in ${{minutes}}:${{seconds}}`;
+}}
+tick();
+setInterval(tick, 1000);
+</script>
+"""
+
+# category -> (snapshot data, rows). Snapshots are immutable and shared, so the
+# sorted view model is built once per snapshot for every session.
+_view_models = {}
+_view_lock = threading.Lock()
+
+
+def build_rows(category, records):
+    # Sorted ItemViews for normalized stock records (see normalize.py)
+    with instrumentation.span("sort", category=category):
+        return tuple(ItemView(item.name, item.quantity, get_item(category, item.name)) for item in sort_items(category, records))
+
+
+def get_rows(category, snapshot):
+    cached = _view_models.get(category)
+    if cached is not None and cached[0] is snapshot.data:
+        return cached[1]
+    rows = build_rows(category, snapshot.data)
+    with _view_lock:
+        _view_models[category] = (snapshot.data, rows)
+    return rows
+
+
+def diff_rows(previous, current):
+    old = {row.name: row.quantity for row in previous}
+    new = {row.name: row.quantity for row in current}
+    return StockDiff(
+        added=tuple(name for name in new if name not in old),
+        removed=tuple(name for name in old if name not in new),
+        changed={name: old[name] for name in new if name in old and new[name] != old[name]},
+    )
+
+
+def track_changes(category, rows, now=None):
+    # Compare against the rows this session last rendered and return
+    # ({name: old quantity or None if new}, names that sold out) for rows that
+    # changed within HIGHLIGHT_SECONDS
+    if now is None:
+        now = time.time()
+    state = st.session_state.setdefault(f"stock_changes_{category}", {"rows": None, "changed": {}, "removed": (0, ())})
+
+    if state["rows"] is not rows:
+        if state["rows"] is not None:
+            diff = diff_rows(state["rows"], rows)
+            for name in diff.added:
+                state["changed"][name] = (now, None)
+            for name, old_quantity in diff.changed.items():
+                state["changed"][name] = (now, old_quantity)
+            if diff.added or diff.removed or diff.changed:
+                state["removed"] = (now, diff.removed)
+        state["rows"] = rows
+
+    state["changed"] = {name: seen for name, seen in state["changed"].items() if now - seen[0] < HIGHLIGHT_SECONDS}
+    removed_at, removed = state["removed"]
+    if now - removed_at >= HIGHLIGHT_SECONDS:
+        removed = ()
+    return {name: seen[1] for name, seen in state["changed"].items()}, removed
+
+
+def _row_key(row):
+    return f"stock_row_{row.entry.category}_{row.entry.slug}"
+
+
+def render_detailed(rows, image_caption=None, changes=None):
+    # One block of columns per item: image, name, rarity, stock and cost.
+    # About eight Streamlit elements per row. Each row sits in a container
+    # keyed by item, so the frontend keeps a row's widgets mounted when rows
+    # move. Every rerun still re-sends every row: bench_render measures about
+    # 1.5 KB of deltas per row when a single row changed. Compact mode sends
+    # one element instead.
+    changes = changes or {}
+    keys = set()
+    for i, row in enumerate(rows):
+        entry = row.entry
+        changed = row.name in changes
+
+        # Element keys must be unique, even if the API repeats an item
+        key = _row_key(row)
+        if key in keys:
+            key = f"{key}_{i}"
+        keys.add(key)
+
+        with st.container(key=key):
+            cols_top = st.columns([1, 4, 1])
+            with cols_top[0]:
+                st.image(image_cache.get_thumbnail(entry.image_url), width=75, caption=image_caption)
+
+            with cols_top[1]:
+                if changed:
+                    st.markdown(f":green-background[**{row.name}**] 🆕" if changes[row.name] is None else f":orange-background[**{row.name}**]")
+                else:
+                    st.write(row.name)
+
+            with cols_top[2]:
+                # Rarity icons are local files, loaded once per process
+                rarity_img = image_cache.rarity_icon(entry.icon)
+                if rarity_img:
+                    st.image(rarity_img, width=75, caption=image_caption)
+                else:
+                    st.write(entry.rarity)
+
+            cols_bottom = st.columns([1, 1])
+            with cols_bottom[0]:
+                if changed and changes[row.name] is not None:
+                    st.write(f"Stock: {row.quantity} (was {changes[row.name]})")
+                else:
+                    st.write(f"Stock: {row.quantity}")
+            with cols_bottom[1]:
+                st.write(f"Cost: {entry.cost} Sheckles")
+
+            st.markdown("---")
+
+
+def _change_label(row, changes):
+    if row.name not in changes:
+        return ""
+    old_quantity = changes[row.name]
+    if old_quantity is None:
+        return "🆕 New"
+    return f"{row.quantity - old_quantity:+d}"
+
+
+def render_compact(rows, changes=None):
+    # The whole category as a single dataframe element. Images are static URLs
+    # to the cached thumbnails, so each row carries a short link, not the image.
+    # Built as an Arrow table so the repetitive columns are dictionary encoded
+    # and no pandas metadata rides along.
+    changes = changes or {}
+    table = pa.table({
+        "Image": [image_cache.thumbnail_url(row.entry.image_url) for row in rows],
+        "Item": [row.name for row in rows],
+        "Change": pa.array([_change_label(row, changes) for row in rows], pa.string()).dictionary_encode(),
+        "Tier": pa.array([image_cache.rarity_icon_url(row.entry.icon) for row in rows], pa.string()).dictionary_encode(),
+        "Rarity": pa.array([row.entry.rarity for row in rows], pa.string()).dictionary_encode(),
+        "Stock": pa.array([row.quantity for row in rows], pa.int64()),
+        "Cost (Sheckles)": pa.array([row.entry.cost for row in rows], pa.int64()),
+    })
+    st.dataframe(
+        table,
+        hide_index=True,
+        width="stretch",
+        row_height=60,
+        column_config={
+            "Image": st.column_config.ImageColumn("Image", width="small"),
+            "Tier": st.column_config.ImageColumn("Tier", width="small"),
+            "Stock": st.column_config.NumberColumn("Stock", format="%d"),
+            "Cost (Sheckles)": st.column_config.NumberColumn("Cost (Sheckles)", format="%d"),
+        },
+    )
+
+
+def render_items(rows, image_caption=None, changes=None):
+    # Never waits on images: the poller fetches thumbnails for new stock in
+    # the background, and any still in flight render as placeholders
+    if st.session_state.get(COMPACT_MODE_KEY, False):
+        render_compact(rows, changes=changes)
+    else:
+        render_detailed(rows, image_caption=image_caption, changes=changes)
+
+
+def render_countdown(endpoint, label):
+    # Ticks in the browser, so the countdown costs no reruns
+    interval = restock.RESTOCK_INTERVALS.get(endpoint, restock.DEFAULT_INTERVAL)
+    st.iframe(COUNTDOWN_HTML.format(interval=interval, label=json.dumps(label)), height=24)
+
+
+def _stock_fragment(category):
+    # Only this part reruns on a refresh; the page title and chrome stay put
+    config = CATEGORIES[category]
+
+    # Fragment timers run on a fixed interval, but restocks land on wall-clock
+    # boundaries. When the timer fires, rerun the page once so the next timer
+    # is aimed at the following boundary.
+    refresh_at = st.session_state.get(f"refresh_at_{category}")
+    if refresh_at is not None and time.time() >= refresh_at:
+        st.session_state.pop(f"refresh_at_{category}")
+        st.rerun()
+
+    snapshot = poller.get_snapshot(config.endpoint)
+    if snapshot is None:
+        error = poller.get_error(config.endpoint)
+        if error:
+            st.error(f"Failed to fetch {config.label}: {error}")
+        else:
+            st.info(f"Fetching the latest {config.label}, check back in a few seconds.")
+        st.button("🔄 Refresh", key=f"refresh_{category}")
+        return
+
+    col_age, col_refresh = st.columns([4, 1])
+    with col_age:
+        st.caption(f"Updated {poller.format_age(poller.snapshot_age(snapshot))} ago")
+    with col_refresh:
+        st.button("🔄 Refresh", key=f"refresh_{category}")
+    if snapshot.last_error:
+        st.warning(f"Showing the last known {config.label}, the latest refresh failed: {snapshot.last_error}")
+
+    try:
+        rows = get_rows(category, snapshot)
+        changes, removed = track_changes(category, rows)
+        if removed:
+            st.caption(f"Sold out since your last refresh: {', '.join(removed)}")
+        with instrumentation.span("render", page=category):
+            render_items(rows, image_caption=config.image_caption, changes=changes)
+    except Exception as e:
+        st.error(f"Failed to render {config.label}: {e}")
+
+
+def render_stock_category(category):
+    # Full stock page for one shop category, driven by categories.CATEGORIES
+    config = CATEGORIES[category]
+    st.title(config.title)
+    poller.start()
+
+    col_countdown, col_auto = st.columns([3, 2])
+    with col_countdown:
+        render_countdown(config.endpoint, config.label)
+    with col_auto:
+        auto_refresh = st.toggle(
+            "Auto-refresh on restock",
+            value=st.session_state.get(AUTO_REFRESH_KEY, True),
+            key=f"auto_refresh_toggle_{category}",
+        )
+    st.session_state[AUTO_REFRESH_KEY] = auto_refresh
+
+    if auto_refresh:
+        now = time.time()
+        refresh_at = restock.next_refresh(config.endpoint, AUTO_REFRESH_DELAY, AUTO_REFRESH_JITTER, now)
+        st.session_state[f"refresh_at_{category}"] = refresh_at
+        st.fragment(_stock_fragment, run_every=refresh_at - now)(category)
+    else:
+        st.session_state.pop(f"refresh_at_{category}", None)
+        st.fragment(_stock_fragment)(category)
@@ -0,0 +1,141 @@
+import base64
+import json
+import re
+from functools import lru_cache
+
+from streamlit_plugins.components.theme_changer.entity import ThemeInfo, ThemeInput, ThemeBaseLight, ThemeBaseDark
+
+# Themes are built once per process and shared by every session, so they must
+# never be mutated. A session's custom theme is stored as a small overrides
+# dict holding only the fields that differ from CUSTOM_THEME_BASE.
+
+PROTECTED_THEMES = ['garden_light', 'garden_dark']
+CUSTOM_THEME_KEY = 'custom_theme_key'
+DEFAULT_INIT_THEME = 'garden_dark'
+
+# Query parameter a custom theme is saved in, so it survives reloads and
+# restarts without any server-side storage
+THEME_QUERY_PARAM = "theme"
+
+garden_light_theme = ThemeInput(
+    name="Garden Oasis (Light)",
+    icon="🌿",
+    order=1,
+    themeInfo=ThemeInfo(
+        base=ThemeBaseLight.base, primaryColor="#388E3C", backgroundColor="#F9FFF5",
+        secondaryBackgroundColor="#E8F5E9", textColor="#000000", widgetBackgroundColor="#FFFFFF",
+        widgetBorderColor="#81C784", skeletonBackgroundColor="#C8E6C9", bodyFont=ThemeBaseLight.bodyFont,
+        codeFont=ThemeBaseLight.codeFont, fontFaces=ThemeBaseLight.fontFaces
+    )
+)
+
+garden_dark_theme = ThemeInput(
+    name="Midnight Flora (Dark)",
+    icon="🌙",
+    order=2,
+    themeInfo=ThemeInfo(
+        base=ThemeBaseDark.base, primaryColor="#8BC34A", backgroundColor="#1C301C",
+        secondaryBackgroundColor="#2E482E", textColor="#E8F5E9", widgetBackgroundColor="#3A573A",
+        widgetBorderColor="#A5D6A7", skeletonBackgroundColor="#556B55", bodyFont=ThemeBaseDark.bodyFont,
+        codeFont=ThemeBaseDark.codeFont, fontFaces=ThemeBaseDark.fontFaces
+    )
+)
+
+custom_theme = ThemeInput(
+    name="Custom Theme",
+    icon="🖌️",
+    order=3,
+    themeInfo=ThemeInfo(
+        base=ThemeBaseDark.base, primaryColor="#FF5722", backgroundColor="#212121",
+        secondaryBackgroundColor="#3A3A3A", textColor="#FFFFFF", widgetBackgroundColor="#424242",
+        widgetBorderColor="#FF9800", skeletonBackgroundColor="#4E4E4E", bodyFont=ThemeBaseDark.bodyFont,
+        codeFont=ThemeBaseDark.codeFont, fontFaces=ThemeBaseDark.fontFaces
+    )
+)
+
+BASE_THEME_DATA = {
+    'garden_light': garden_light_theme,
+    'garden_dark': garden_dark_theme,
+    CUSTOM_THEME_KEY: custom_theme,
+}
+
+# Fields the Custom Theme Maker can change -> short key used in the query param
+CUSTOM_FIELDS = {
+    "primaryColor": "p",
+    "textColor": "t",
+    "backgroundColor": "b",
+    "secondaryBackgroundColor": "s",
+    "widgetBackgroundColor": "w",
+    "widgetBorderColor": "o",
+    "bodyFont": "f",
+    "codeFont": "c",
+}
+FONT_FIELDS = ("bodyFont", "codeFont")
+MAX_FONT_LENGTH = 200
+
+_COLOR = re.compile(r"^#[0-9A-Fa-f]{6}$")
+
+
+def make_overrides(values):
+    # {field: value} from the theme form -> only the fields that differ from
+    # the base custom theme, after validation
+    overrides = {}
+    for field, value in values.items():
+        if field not in CUSTOM_FIELDS or not isinstance(value, str):
+            continue
+        if field in FONT_FIELDS:
+            value = value.strip()[:MAX_FONT_LENGTH]
+            if not value:
+                continue
+        elif not _COLOR.match(value):
+            continue
+        if value != getattr(custom_theme.themeInfo, field):
+            overrides[field] = value
+    return overrides
+
+
+@lru_cache(maxsize=256)
+def _theme_data(key):
+    themeInfo = custom_theme.themeInfo.model_copy(update=dict(key))
+    return {
+        **BASE_THEME_DATA,
+        CUSTOM_THEME_KEY: custom_theme.model_copy(update={"themeInfo": themeInfo}),
+    }
+
+
+def theme_data(overrides):
+    # Theme set for a session. Sessions without a custom theme share
+    # BASE_THEME_DATA, and sessions with the same overrides share one copy.
+    if not overrides:
+        return BASE_THEME_DATA
+    return _theme_data(tuple(sorted(overrides.items())))
+
+
+def encode_overrides(overrides):
+    # Short, URL-safe form of a custom theme for the query string
+    short = {
+        CUSTOM_FIELDS[field]: value[1:] if field not in FONT_FIELDS else value
+        for field, value in overrides.items()
+    }
+    raw = json.dumps(short, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_overrides(text):
+    # Inverse of encode_overrides(). Anything malformed decodes to {}.
+    if not text:
+        return {}
+    fields = {short: field for field, short in CUSTOM_FIELDS.items()}
+    try:
+        short = json.loads(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)))
+    except ValueError:
+        return {}
+    if not isinstance(short, dict):
+        return {}
+    values = {}
+    for key, value in short.items():
+        field = fields.get(key)
+        if field is None or not isinstance(value, str):
+            continue
+        values[field] = value if field in FONT_FIELDS else f"#{value}"
+    return make_overrides(values)
@@ -0,0 +1,323 @@
+import ipaddress
+import json
+import logging
+import os
+import queue
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from restock import last_restock
+from settings import DATA_DIR, WEBHOOK_HOSTS
+
+logger = logging.getLogger(__name__)
+
+# Restock alerts for watched items. Subscriptions live in SQLite and are
+# indexed in memory by item name, so each new snapshot only looks up the items
+# that changed. An alert is sent at most once per subscription per restock
+# cycle, even across restarts.
+#
+# Subscriptions are added from a public page, so every one belongs to an
+# owner token held by the browser that created it, and only that owner can
+# list or remove it. The file sink always writes to DEFAULT_ALERT_FILE and
+# webhooks may only go to https URLs on WEBHOOK_HOSTS that resolve to public
+# addresses.
+
+DB_PATH = os.path.join(DATA_DIR, "watchlist.sqlite3")
+
+# Where the "file" sink writes, for every subscription
+DEFAULT_ALERT_FILE = os.path.join(DATA_DIR, "alerts.jsonl")
+
+WEBHOOK_TIMEOUT = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    item TEXT NOT NULL,
+    sink TEXT NOT NULL,
+    target TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    UNIQUE (owner, item, sink, target)
+);
+CREATE INDEX IF NOT EXISTS subscriptions_item ON subscriptions (item);
+CREATE INDEX IF NOT EXISTS subscriptions_owner ON subscriptions (owner);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    subscription_id INTEGER NOT NULL,
+    endpoint TEXT NOT NULL,
+    item TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    cycle REAL NOT NULL,
+    seen_at REAL NOT NULL,
+    UNIQUE (subscription_id, cycle)
+);
+CREATE INDEX IF NOT EXISTS alerts_time ON alerts (seen_at);
+"""
+
+Subscription = namedtuple("Subscription", ["id", "owner", "item", "sink", "target", "created_at"])
+Alert = namedtuple("Alert", ["subscription_id", "endpoint", "item", "quantity", "cycle", "seen_at", "sink", "target"])
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_schema_ready = False
+# item name (lower case) -> tuple of Subscriptions. Replaced, never mutated.
+_index = None
+_index_lock = threading.Lock()
+_outbox = queue.Queue()
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def connect():
+    # One connection per thread, like history.py
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not _schema_ready:
+            with _write_lock:
+                conn.executescript(SCHEMA)
+            _schema_ready = True
+        _local.conn = conn
+    return conn
+
+
+def _message(alert):
+    # What sinks receive: everything but the target, which may be a secret
+    message = alert._asdict()
+    message.pop("target")
+    return message
+
+
+def send_file(alert):
+    # Append one JSON line per alert to the server's alert file
+    os.makedirs(os.path.dirname(DEFAULT_ALERT_FILE), exist_ok=True)
+    with open(DEFAULT_ALERT_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_message(alert)) + "\n")
+
+
+def _allowed_host(host):
+    return any(host == allowed or host.endswith("." + allowed) for allowed in WEBHOOK_HOSTS)
+
+
+def check_webhook_url(url):
+    # Raises ValueError unless url is https on an allowed host that resolves
+    # only to public addresses. Checked on subscribe and again before every
+    # POST, since DNS can change in between.
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme != "https" or not host:
+        raise ValueError("webhook must be an https URL")
+    if not _allowed_host(host):
+        raise ValueError(f"webhooks may only go to {', '.join(WEBHOOK_HOSTS) or 'no hosts on this server'}")
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or 443, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError) as e:
+        raise ValueError(f"cannot resolve webhook host {host}: {e}") from None
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise ValueError(f"webhook host {host} resolves to a non-public address")
+
+
+def send_webhook(alert):
+    # POST the alert as JSON to the target URL, without following redirects
+    import httpx
+
+    check_webhook_url(alert.target)
+    httpx.post(alert.target, json=_message(alert), timeout=WEBHOOK_TIMEOUT, follow_redirects=False).raise_for_status()
+
+
+# sink name -> function(alert). Add entries with register_sink().
+SINKS = {
+    "file": send_file,
+    "webhook": send_webhook,
+}
+
+
+def register_sink(name, send):
+    SINKS[name] = send
+
+
+def _send_forever():
+    while True:
+        alert = _outbox.get()
+        send = SINKS.get(alert.sink)
+        try:
+            if send is None:
+                raise ValueError(f"unknown sink {alert.sink!r}")
+            send(alert)
+        except Exception as e:
+            logger.warning("Sending %s alert for %s failed: %s", alert.sink, alert.item, e)
+        finally:
+            _outbox.task_done()
+
+
+def _enqueue(alerts):
+    # Sinks may be slow (webhooks), so they run on their own thread rather
+    # than on the poller's
+    global _sender
+    if _sender is None:
+        with _sender_lock:
+            if _sender is None:
+                _sender = threading.Thread(target=_send_forever, name="watchlist-sender", daemon=True)
+                _sender.start()
+    for alert in alerts:
+        _outbox.put(alert)
+
+
+def flush(timeout=None):
+    # Wait until every queued alert has been handed to its sink
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while _outbox.unfinished_tasks:
+        if deadline is not None and time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _load_index():
+    index = {}
+    for row in connect().execute("SELECT id, owner, item, sink, target, created_at FROM subscriptions ORDER BY id"):
+        subscription = Subscription(*row)
+        index.setdefault(subscription.item.lower(), []).append(subscription)
+    return {item: tuple(subscriptions) for item, subscriptions in index.items()}
+
+
+def _get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _load_index()
+    return _index
+
+
+def _reload_index():
+    global _index
+    index = _load_index()
+    with _index_lock:
+        _index = index
+
+
+def new_owner():
+    # Token identifying whoever creates subscriptions, kept by their browser
+    return secrets.token_urlsafe(16)
+
+
+def mask_target(target):
+    # Enough of a webhook URL to recognise it, without the secret path
+    if not target:
+        return ""
+    return f"{urlsplit(target).hostname or '?'}/…"
+
+
+def subscribe(owner, item, sink="file", target=""):
+    # Watch an item by name. Returns the Subscription, existing or new.
+    item = item.strip()
+    if not owner:
+        raise ValueError("owner is required")
+    if not item:
+        raise ValueError("item name is required")
+    if sink not in SINKS:
+        raise ValueError(f"unknown sink {sink!r}")
+    if sink == "file":
+        target = ""
+    elif sink == "webhook":
+        check_webhook_url(target)
+    conn = connect()
+    with _write_lock, conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO subscriptions (owner, item, sink, target, created_at) VALUES (?, ?, ?, ?, ?)",
+            (owner, item, sink, target, time.time()),
+        )
+        row = conn.execute(
+            """
+            SELECT id, owner, item, sink, target, created_at FROM subscriptions
+            WHERE owner = ? AND item = ? AND sink = ? AND target = ?
+            """,
+            (owner, item, sink, target),
+        ).fetchone()
+    _reload_index()
+    return Subscription(*row)
+
+
+def unsubscribe(owner, subscription_id):
+    # Only the owner can remove a subscription. Returns True if it did.
+    conn = connect()
+    with _write_lock, conn:
+        cur = conn.execute("DELETE FROM subscriptions WHERE id = ? AND owner = ?", (subscription_id, owner))
+    _reload_index()
+    return cur.rowcount == 1
+
+
+def subscriptions(owner):
+    if not owner:
+        return []
+    return [subscription for subscriptions in _get_index().values() for subscription in subscriptions if subscription.owner == owner]
+
+
+def recent_alerts(owner, limit=100):
+    # The owner's alerts, newest first: (item, endpoint, quantity, seen_at, sink, target)
+    if not owner:
+        return []
+    return connect().execute(
+        """
+        SELECT a.item, a.endpoint, a.quantity, a.seen_at, s.sink, s.target FROM alerts a
+        JOIN subscriptions s ON s.id = a.subscription_id
+        WHERE s.owner = ?
+        ORDER BY a.seen_at DESC
+        LIMIT ?
+        """,
+        (owner, limit),
+    ).fetchall()
+
+
+def changed_items(previous, records):
+    # In-stock (name, quantity) pairs that are new or changed since previous
+    before = {(item.name, item.quantity) for item in previous or ()}
+    return [(item.name, item.quantity) for item in records if item.quantity > 0 and (item.name, item.quantity) not in before]
+
+
+def check(endpoint, previous, records, seen_at=None):
+    # Match the items that changed between two snapshots against the index and
+    # queue an alert for every subscription not yet alerted this cycle.
+    # Returns the queued Alerts.
+    index = _get_index()
+    if not index:
+        return []
+    matches = [
+        (subscription, name, quantity)
+        for name, quantity in changed_items(previous, records)
+        for subscription in index.get(name.lower(), ())
+    ]
+    if not matches:
+        return []
+
+    if seen_at is None:
+        seen_at = time.time()
+    cycle = last_restock(endpoint, seen_at)
+    alerts = []
+    conn = connect()
+    with _write_lock, conn:
+        for subscription, name, quantity in matches:
+            cur = conn.execute(
+                """
+                INSERT OR IGNORE INTO alerts (subscription_id, endpoint, item, quantity, cycle, seen_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (subscription.id, endpoint, name, quantity, cycle, seen_at),
+            )
+            # Already alerted this cycle, e.g. the quantity changed mid-cycle
+            if cur.rowcount:
+                alerts.append(Alert(subscription.id, endpoint, name, quantity, cycle, seen_at, subscription.sink, subscription.target))
+    _enqueue(alerts)
+    return alerts
@@ -0,0 +1,90 @@
+# Profit calculator cost as the seed, mutation and stack lists grow: the
+# broadcasted calculator.py against the same maths in nested Python loops
+#
+#   python benchmarks/bench_calculator.py [--sizes 26 100 1000] [--mutations 34 200]
+#       [--weathers 14] [--stacks 20] [--budget-ms 50]
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Web"))
+
+import calculator  # noqa: E402
+import crops  # noqa: E402
+
+
+def make_table(seeds, mutations, weathers, seed=0):
+    rng = random.Random(seed)
+    crop_values = {f"Seed {i}": (rng.randint(10, 100000), rng.uniform(0.1, 20)) for i in range(seeds)}
+    costs = {name: rng.randint(10, 10 ** 8) for name in crop_values}
+    multipliers = {f"Mutation {i}": rng.choice([2, 3, 5, 10, 25, 100, 150]) for i in range(mutations)}
+    names = list(multipliers)
+    weather_mutations = {
+        f"Weather {i}": {name: rng.uniform(0, 0.5) for name in rng.sample(names, min(3, len(names)))}
+        for i in range(weathers)
+    }
+    return calculator.build_table(crop_values, costs, multipliers, weather_mutations)
+
+
+def make_stacks(table, count, seed=0):
+    rng = random.Random(seed)
+    stacks = [rng.sample(table.mutations, rng.randint(0, min(4, len(table.mutations)))) for _ in range(count)]
+    growth = [rng.choice([1, crops.GROWTH_MUTATIONS["Gold"], crops.GROWTH_MUTATIONS["Rainbow"]]) for _ in range(count)]
+    weights = [rng.uniform(0.5, 5) for _ in range(count)]
+    return stacks, growth, weights
+
+
+def vectorized(table, stacks, growth, weights):
+    expected = calculator.expected_values(table.chances, calculator.growth_multiplier(0.01, 0.001), 1.5, table)
+    calculator.roi(expected, 1, table)
+    calculator.single_values(table)
+    calculator.stack_values(calculator.stack_matrix(stacks, table), growth, weights, table)
+
+
+def looped(table, stacks, growth, weights):
+    # Same results, one seed and one combination at a time
+    expected_growth = 1 + 0.01 * 19 + 0.001 * 49
+    bonuses = dict(zip(table.mutations, table.bonuses.tolist()))
+    for n, value in enumerate(table.values.tolist()):
+        cost = table.costs[n]
+        for row in table.chances.tolist():
+            ev = value * expected_growth * 1.5 ** 2 * (1 + sum(c * b for c, b in zip(row, bonuses.values())))
+            (ev - cost) / cost
+        for bonus in bonuses.values():
+            value * (1 + bonus)
+        for names, g, w in zip(stacks, growth, weights):
+            value * g * w ** 2 * (1 + sum(bonuses[name] for name in names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the profit calculator")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[26, 100, 1000], help="seed counts")
+    parser.add_argument("--mutations", type=int, nargs="+", default=[34, 200])
+    parser.add_argument("--weathers", type=int, default=14)
+    parser.add_argument("--stacks", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    over = False
+    print(f"{'seeds':>6} {'mutations':>9} {'loops (ms)':>11} {'numpy (ms)':>11} {'speedup':>8}")
+    for mutations in args.mutations:
+        for size in args.sizes:
+            table = make_table(size, mutations, args.weathers)
+            stacks, growth, weights = make_stacks(table, args.stacks)
+            number = max(1, 2000 // size)
+            loop = min(timeit.repeat(lambda: looped(table, stacks, growth, weights), number=1, repeat=args.repeat))
+            numpy = min(timeit.repeat(lambda: vectorized(table, stacks, growth, weights), number=number, repeat=args.repeat)) / number
+            over = over or numpy * 1000 > args.budget_ms
+            print(f"{size:>6} {mutations:>9} {loop * 1000:>11.2f} {numpy * 1000:>11.3f} {loop / numpy:>7.1f}x")
+
+    if over:
+        print(f"\nSome sizes took longer than the {args.budget_ms:.0f}ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
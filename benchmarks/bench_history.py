@@ -0,0 +1,129 @@
+# History check: replays jittered polls through history.py and predictor.py
+# and checks that both count the same restock cycles
+#
+# Polls land just after each wall-clock restock boundary plus some jitter,
+# like poller.py's, with an occasional recheck poll that sees unchanged stock.
+# One item is in every restock, another in every other one. Exits with
+# status 1 if the live predictor, the predictor rebuilt from the stored
+# history, or history.restock_frequency gets the cycle count or odds wrong.
+#
+# Then records --days of 5-minute gear snapshots through history.record() and
+# times restock_frequency for the Stock History page's windows.
+#
+#   python benchmarks/bench_history.py [--cycles 200] [--seed 0] [--days 90] [--repeat 5]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+WEB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Web")
+sys.path.insert(0, WEB_DIR)
+
+# Keep the replay away from the real history database
+os.environ["GAG_DATA_DIR"] = tempfile.mkdtemp(prefix="gag-bench-history-")
+
+import history  # noqa: E402
+import predictor  # noqa: E402
+from normalize import StockItem  # noqa: E402
+from restock import RESTOCK_INTERVALS  # noqa: E402
+
+ENDPOINT = "seeds"
+ALWAYS = "Carrot"
+HALF = "Strawberry"
+
+# Poll timing after each boundary, as poller.py schedules it
+SETTLE = 5
+JITTER = (0.05, 1.5)
+RECHECK_DELAY = 20
+
+
+def replay(cycles, seed):
+    rng = random.Random(seed)
+    interval = RESTOCK_INTERVALS[ENDPOINT]
+    start = 1_700_000_000 // interval * interval
+    for cycle in range(cycles):
+        records = [StockItem(ALWAYS, 3)] + ([StockItem(HALF, 1)] if cycle % 2 == 0 else [])
+        seen_at = start + cycle * interval + SETTLE + rng.uniform(*JITTER)
+        polls = [seen_at] + ([seen_at + RECHECK_DELAY] if rng.random() < 0.3 else [])
+        for poll_at in polls:
+            history.record(ENDPOINT, records, poll_at)
+            predictor.observe(ENDPOINT, records, poll_at)
+    return start + cycles * interval
+
+
+def check(label, observed, always, half, cycles):
+    expected_half = (cycles + 1) // 2
+    ok = observed == cycles and always == cycles and half == expected_half
+    print(f"{label:<22} {observed:>7} {always:>7} {half:>7}  {'ok' if ok else f'expected {cycles}/{cycles}/{expected_half}'}")
+    return ok
+
+
+def time_frequency(days, repeat):
+    # Months of snapshots that change every restock, like the live shops
+    endpoint = "gear"
+    interval = RESTOCK_INTERVALS[endpoint]
+    cycles = days * 86400 // interval
+    start = 1_600_000_000 // interval * interval
+    names = [f"Gear {i}" for i in range(12)]
+    started = time.perf_counter()
+    for cycle in range(cycles):
+        seen_at = start + cycle * interval + SETTLE
+        records = [StockItem(name, 1 if (cycle + i) % 3 else 0) for i, name in enumerate(names)]
+        history.record(endpoint, records, seen_at)
+        history.record(endpoint, records, seen_at + RECHECK_DELAY)
+    recorded = time.perf_counter() - started
+    now = start + cycles * interval
+
+    print(f"\n{days} days of {endpoint} snapshots ({cycles} restocks, {recorded / cycles / 2 * 1000:.2f} ms per poll)")
+    print(f"{'window':>8} {'restocks':>9} {'time (ms)':>10}")
+    ok = True
+    for window_days in (1, 7, 30, None):
+        since = now - window_days * 86400 if window_days else 0
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            total, _ = history.restock_frequency(endpoint, since)
+            timings.append(time.perf_counter() - started)
+        ok = ok and total == (window_days * 86400 // interval if window_days else cycles)
+        label = f"{window_days}d" if window_days else "all"
+        print(f"{label:>8} {total:>9} {min(timings) * 1000:>10.1f}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check restock cycle counting against jittered polls")
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Start from an empty, loaded model so observe() does not replay anything
+    predictor.load()
+    now = replay(args.cycles, args.seed)
+
+    print(f"{'':<22} {'cycles':>7} {ALWAYS:>7} {HALF[:7]:>7}")
+    results = []
+    for label in ("predictor (live)", "predictor (replayed)"):
+        always = predictor.predict(ALWAYS, ENDPOINT, now)
+        half = predictor.predict(HALF, ENDPOINT, now)
+        results.append(check(label, always.cycles_observed, always.cycles_seen, half.cycles_seen, args.cycles))
+        print(f"{'':<22} odds {always.probability:.2f} / {half.probability:.2f}")
+        results.append(abs(half.probability - 0.5) < 0.05)
+        # Rebuild the model from the stored history for the second pass
+        predictor._models.clear()
+        predictor._loaded = False
+
+    total, counts = history.restock_frequency(ENDPOINT)
+    results.append(check("history", total, counts.get(ALWAYS, 0), counts.get(HALF, 0), args.cycles))
+    results.append(time_frequency(args.days, args.repeat))
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Load test: many headless sessions per page against the local fake upstream
+#
+# Starts benchmarks/fake_upstream.py in-process, points stock_api at it, then
+# runs every page in Web/pages with Streamlit's AppTest from a pool of
+# concurrent sessions. Reports per page the script run time, upstream calls
+# per session and memory retained per live session (tracemalloc), followed by
+# the app's own fetch/parse/sort/render span percentiles.
+#
+#   python benchmarks/bench_load.py [--sessions 20] [--concurrency 4] [--items 40]
+#       [--latency 0.05] [--error-rate 0.0] [--pages Seed Weather] [--compact]
+
+import argparse
+import gc
+import glob
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+WEB_DIR = os.path.join(os.path.dirname(BENCH_DIR), "Web")
+sys.path.insert(0, WEB_DIR)
+
+import fake_upstream  # noqa: E402
+
+SNAPSHOT_TIMEOUT = 30
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def warm_images(items):
+    # Keep the run offline: every item image is served from memory
+    import image_cache
+    from catalog import get_item
+
+    thumbnail = image_cache.placeholder()
+    for endpoint in fake_upstream.STOCK_ORDERS:
+        for name in fake_upstream.make_names(endpoint, items):
+            image_cache._remember(get_item(endpoint, name).image_url, thumbnail)
+
+
+def wait_for_snapshots(poller, endpoints):
+    deadline = time.monotonic() + SNAPSHOT_TIMEOUT
+    while time.monotonic() < deadline:
+        if all(poller.get_snapshot(endpoint) is not None for endpoint in endpoints):
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def run_session(path, compact):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(path, default_timeout=60)
+    at.session_state["compact_mode"] = compact
+    started = time.perf_counter()
+    at.run()
+    return time.perf_counter() - started, at
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard pages against a fake upstream")
+    parser.add_argument("--sessions", type=int, default=20, help="sessions per page")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--items", type=int, default=40, help="items per stock endpoint")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--pages", nargs="*", help="only pages whose file name contains one of these")
+    parser.add_argument("--compact", action="store_true", help="render stock in compact table mode")
+    args = parser.parse_args()
+
+    # Throwaway state, no mirror port, and every upstream URL on the fake
+    scratch = tempfile.mkdtemp(prefix="gag-bench-")
+    os.environ["GAG_DATA_DIR"] = os.path.join(scratch, "data")
+    os.environ["GAG_CACHE_DIR"] = os.path.join(scratch, "cache")
+    os.environ["GAG_MIRROR_PORT"] = "0"
+    upstream = fake_upstream.start(items=args.items, latency=args.latency, error_rate=args.error_rate)
+    os.environ.update(upstream.env())
+
+    import instrumentation
+    import poller
+    import stock_api
+
+    warm_images(args.items)
+    poller.start()
+    if not wait_for_snapshots(poller, stock_api.ENDPOINTS):
+        print(f"Warning: not every endpoint had a snapshot after {SNAPSHOT_TIMEOUT}s")
+    instrumentation.reset()
+
+    pages = sorted(glob.glob(os.path.join(WEB_DIR, "pages", "*.py")))
+    if args.pages:
+        pages = [page for page in pages if any(part in os.path.basename(page) for part in args.pages)]
+
+    print(f"{args.sessions} sessions per page, {args.concurrency} at a time, {args.items} items per endpoint")
+    print(f"{'page':<24} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9} {'calls/sess':>10} {'KiB/sess':>9} {'errors':>6}")
+    tracemalloc.start()
+    for page in pages:
+        gc.collect()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        calls_before = upstream.total_requests()
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda _: run_session(page, args.compact), range(args.sessions)))
+
+        gc.collect()
+        # Measured while every session is still alive
+        memory = (tracemalloc.get_traced_memory()[0] - memory_before) / args.sessions
+        calls = (upstream.total_requests() - calls_before) / args.sessions
+        times = [elapsed for elapsed, _ in results]
+        errors = sum(1 for _, at in results if at.exception)
+        name = os.path.splitext(os.path.basename(page))[0]
+        print(
+            f"{name:<24} {percentile(times, 0.5) * 1000:>9.1f} {percentile(times, 0.95) * 1000:>9.1f} "
+            f"{max(times) * 1000:>9.1f} {calls:>10.2f} {memory / 1024:>9.1f} {errors:>6}"
+        )
+        del results
+    tracemalloc.stop()
+
+    print()
+    print(f"{'span':<10} {'where':<14} {'count':>6} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for s in instrumentation.summary():
+        where = ", ".join(str(value) for value in s.labels.values())
+        print(f"{s.name:<10} {where:<14} {s.count:>6} {s.p50 * 1000:>9.2f} {s.p95 * 1000:>9.2f} {s.p99 * 1000:>9.2f}")
+    print(f"\nUpstream requests: {upstream.request_counts()}")
+    poller.stop()
+    upstream.shutdown()
+
+
+if __name__ == "__main__":
+    main()
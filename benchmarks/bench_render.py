@@ -0,0 +1,148 @@
+# Render benchmark: detailed per-item rows vs the compact single-table mode
+#
+# Drives stock_view headlessly with Streamlit's AppTest and reports the number
+# of elements emitted, their serialized size, the images they make the
+# browser fetch (st.image media for detailed rows, static thumbnails for the
+# compact table) and the script run time. Then reruns with one row's stock
+# changed and reports the delta bytes that rerun sends to the browser: every
+# element is re-sent, changed or not. Exits with status 1 if the compact
+# payload (elements plus images) is ever larger than the detailed one.
+#
+#   python benchmarks/bench_render.py [--sizes 10 50 200] [--repeat 3]
+
+import argparse
+import os
+import sys
+import time
+
+WEB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Web")
+sys.path.insert(0, WEB_DIR)
+
+import streamlit.testing.v1.app_test as app_test  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+import image_cache  # noqa: E402
+from catalog import get_item  # noqa: E402
+from order import SEED_ORDER  # noqa: E402
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {web_dir!r})
+
+import streamlit as st
+import stock_view
+from normalize import StockItem
+
+st.session_state["compact_mode"] = {compact!r}
+# Each round restocks the first item with one more unit
+bump = st.session_state.get("round", 0)
+data = [StockItem(name, i % 7 + (bump if i == 0 else 0)) for i, name in enumerate({names!r})]
+rows = stock_view.build_rows("seeds", data)
+changes, removed = stock_view.track_changes("seeds", rows)
+stock_view.render_items(rows, changes=changes)
+
+# Bytes of the st.image payloads this run served from /media
+from streamlit.runtime import Runtime
+stats = Runtime.instance().media_file_mgr._storage.get_stats()
+st.session_state["media_bytes"] = sum(stat.byte_length for family in stats.values() for stat in family)
+"""
+
+
+class RecordingScriptRunner(LocalScriptRunner):
+    # Keeps the last runner, so a run's forward messages can be counted
+    last = None
+
+    def run(self, *args, **kwargs):
+        RecordingScriptRunner.last = self
+        return super().run(*args, **kwargs)
+
+
+app_test.LocalScriptRunner = RecordingScriptRunner
+
+
+def delta_bytes():
+    # Bytes of element deltas the last run queued for the browser
+    return sum(msg.ByteSize() for msg in RecordingScriptRunner.last.forward_msgs() if msg.HasField("delta"))
+
+
+def make_names(size):
+    return [SEED_ORDER[i % len(SEED_ORDER)] if i < len(SEED_ORDER) else f"Synthetic Seed {i}" for i in range(size)]
+
+
+def warm_images(names):
+    # Keep the benchmark offline: every thumbnail is served from memory
+    thumbnail = image_cache.placeholder()
+    for name in names:
+        image_cache._remember(get_item("seeds", name).image_url, thumbnail)
+
+
+def walk(node):
+    children = getattr(node, "children", None)
+    if children is None:
+        yield node
+        return
+    for child in children.values():
+        yield from walk(child)
+
+
+def measure(names, compact, repeat):
+    script = SCRIPT.format(web_dir=WEB_DIR, compact=compact, names=names)
+    best = None
+    for _ in range(repeat):
+        at = AppTest.from_string(script, default_timeout=60)
+        started = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(at.exception)
+        best = elapsed if best is None else min(best, elapsed)
+
+    elements = list(walk(at.main))
+    size = sum(e.proto.ByteSize() for e in elements if getattr(e, "proto", None) is not None)
+    images = at.session_state["media_bytes"] + static_bytes(elements)
+
+    at.session_state["round"] = 1
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+    return len(elements), size, images, delta_bytes(), best
+
+
+def static_bytes(elements):
+    # Size of the distinct static thumbnails the compact table links to
+    urls = set()
+    for element in elements:
+        if type(element).__name__ == "Dataframe":
+            for column in ("Image", "Tier"):
+                urls.update(url for url in element.value[column] if isinstance(url, str) and url.startswith(image_cache.STATIC_IMAGE_URL))
+    return sum(os.path.getsize(os.path.join(image_cache.STATIC_IMAGE_DIR, url.rsplit("/", 1)[1])) for url in urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stock page rendering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'items':>6} {'mode':>9} {'elements':>9} {'bytes':>10} {'images':>10} {'rerun':>10} {'run (ms)':>9}")
+    regressions = []
+    for size in args.sizes:
+        names = make_names(size)
+        warm_images(names)
+        payload = {}
+        for compact in (False, True):
+            count, size_bytes, image_bytes, rerun_bytes, elapsed = measure(names, compact, args.repeat)
+            mode = "compact" if compact else "detailed"
+            payload[mode] = size_bytes + image_bytes
+            print(f"{size:>6} {mode:>9} {count:>9} {size_bytes:>10} {image_bytes:>10} {rerun_bytes:>10} {elapsed * 1000:>9.1f}")
+        if payload["compact"] > payload["detailed"]:
+            regressions.append(size)
+
+    if regressions:
+        print(f"\nCompact payload is larger than detailed for {', '.join(map(str, regressions))} items")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Multi-replica benchmark: upstream requests and snapshot agreement when
+# several server processes poll the same endpoints at the same restock
+#
+# Starts benchmarks/fake_upstream.py and benchmarks/fake_redis.py in-process,
+# then for each shared cache mode runs N replica processes that all force a
+# fetch of every endpoint at the same moment, like their pollers do just after
+# a restock. Reports upstream requests per restock and whether every replica
+# ended up with the same data and shared snapshot version.
+#
+#   python benchmarks/bench_replicas.py [--replicas 4] [--restocks 3] [--latency 0.2]
+#       [--modes none sqlite redis]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+WEB_DIR = os.path.join(os.path.dirname(BENCH_DIR), "Web")
+sys.path.insert(0, BENCH_DIR)
+
+import fake_redis  # noqa: E402
+import fake_upstream  # noqa: E402
+
+REPLICA_SCRIPT = """
+import hashlib, json, sys, time
+sys.path.insert(0, {web_dir!r})
+import stock_api
+from concurrent.futures import ThreadPoolExecutor
+
+digests = []
+versions = []
+for start_at in {start_times!r}:
+    time.sleep(max(0, start_at - time.time()))
+    with ThreadPoolExecutor(len(stock_api.ENDPOINTS)) as pool:
+        results = dict(zip(stock_api.ENDPOINTS, pool.map(lambda e: stock_api.fetch(e, force=True), stock_api.ENDPOINTS)))
+    digests.append(hashlib.sha1(repr(sorted(results.items())).encode()).hexdigest())
+    versions.append(stock_api.cache_stats()["shared_versions"])
+print(json.dumps({{"digests": digests, "versions": versions}}))
+"""
+
+# Seconds between simulated restocks; longer than the shared force window so
+# every restock is a fresh upstream fetch
+RESTOCK_GAP = 20
+
+
+def run_mode(mode, args, upstream, redis):
+    scratch = tempfile.mkdtemp(prefix=f"gag-replicas-{mode}-")
+    env = dict(os.environ)
+    env.update(upstream.env())
+    env["GAG_MIRROR_PORT"] = "0"
+    env["GAG_CACHE_DIR"] = os.path.join(scratch, "cache")
+    env["GAG_SHARED_CACHE"] = {
+        "none": "",
+        "sqlite": f"sqlite:///{os.path.join(scratch, 'shared.sqlite3')}",
+        "redis": redis.url,
+    }[mode]
+
+    # Replicas need a second or so to import before the first restock
+    first = time.time() + 2
+    start_times = [first + i * args.gap for i in range(args.restocks)]
+    script = REPLICA_SCRIPT.format(web_dir=WEB_DIR, start_times=start_times)
+    before = upstream.total_requests()
+    replicas = []
+    for i in range(args.replicas):
+        replica_env = dict(env, GAG_DATA_DIR=os.path.join(scratch, f"data-{i}"))
+        replicas.append(subprocess.Popen([sys.executable, "-c", script], env=replica_env, stdout=subprocess.PIPE, text=True))
+    outputs = [json.loads(replica.communicate()[0].strip().splitlines()[-1]) for replica in replicas]
+    requests = upstream.total_requests() - before
+
+    same_data = sum(len({output["digests"][i] for output in outputs}) == 1 for i in range(args.restocks))
+    same_version = sum(
+        len({json.dumps(output["versions"][i], sort_keys=True) for output in outputs}) == 1 and bool(outputs[0]["versions"][i])
+        for i in range(args.restocks)
+    )
+    return requests / args.restocks, same_data, same_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upstream requests across replica processes")
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--restocks", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--gap", type=float, default=RESTOCK_GAP, help="seconds between simulated restocks")
+    parser.add_argument("--modes", nargs="+", choices=("none", "sqlite", "redis"), default=["none", "sqlite", "redis"])
+    args = parser.parse_args()
+
+    upstream = fake_upstream.start(latency=args.latency)
+    redis = fake_redis.start()
+    endpoints = len(fake_upstream.STOCK_ORDERS) + 1
+
+    print(f"{args.replicas} replicas, {endpoints} endpoints, {args.restocks} restocks")
+    print(f"{'shared cache':<14} {'upstream req/restock':>21} {'same data':>10} {'same version':>13}")
+    for mode in args.modes:
+        per_restock, same_data, same_version = run_mode(mode, args, upstream, redis)
+        print(
+            f"{mode:<14} {per_restock:>21.1f} {f'{same_data}/{args.restocks}':>10} "
+            f"{f'{same_version}/{args.restocks}' if mode != 'none' else '-':>13}"
+        )
+    print(f"\nIdeal: {endpoints} upstream requests per restock")
+    upstream.shutdown()
+    redis.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Micro-benchmark: old list.index() sort key vs the precomputed ranks in order.py
+#
+#   python benchmarks/bench_sort.py [--sizes 10 100 1000 10000] [--repeat 5]
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Web"))
+
+from normalize import StockItem  # noqa: E402
+from order import SEED_ORDER, sort_items  # noqa: E402
+from rarity import rarity_data  # noqa: E402
+
+
+def make_stock(size, seed=0):
+    # Mostly listed seeds, plus some rarity-only and completely unknown names
+    rng = random.Random(seed)
+    names = SEED_ORDER + list(rarity_data) + [f"Mystery Seed {i}" for i in range(50)]
+    return [StockItem(rng.choice(names), rng.randint(0, 20)) for _ in range(size)]
+
+
+def legacy_sort(items):
+    items = list(items)
+    items.sort(key=lambda x: SEED_ORDER.index(x.name) if x.name in SEED_ORDER else 999)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stock sorting")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'list.index (ms)':>16} {'sort_items (ms)':>16} {'speedup':>8}")
+    for size in args.sizes:
+        stock = make_stock(size)
+        number = max(1, 20000 // size)
+        legacy = min(timeit.repeat(lambda: legacy_sort(stock), number=number, repeat=args.repeat)) / number
+        ranked = min(timeit.repeat(lambda: sort_items("seeds", stock), number=number, repeat=args.repeat)) / number
+        print(f"{size:>8} {legacy * 1000:>16.3f} {ranked * 1000:>16.3f} {legacy / ranked:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Cold start benchmark: import cost of the app's modules and time to first render
+#
+# Every measurement runs in a fresh interpreter, like a scaled-to-zero instance
+# waking up. Streamlit itself is imported first and not counted, because the
+# server has it loaded before the first script run.
+#
+#   python benchmarks/bench_startup.py [--repeat 3] [--budget-ms 1500]
+#
+# With --budget-ms the script exits with status 1 when the Welcome page's first
+# render takes longer, so it can guard a CI step.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+WEB_DIR = os.path.join(os.path.dirname(BENCH_DIR), "Web")
+
+# What Welcome.py and the stock pages import
+APP_MODULES = (
+    "settings",
+    "instrumentation",
+    "normalize",
+    "stock_api",
+    "poller",
+    "themes",
+    "stock_view",
+    "streamlit_plugins.components.theme_changer",
+)
+
+ITEMS = 40
+
+PAGES = (
+    "Welcome.py",
+    os.path.join("pages", "2_🌾_Seed Stock.py"),
+)
+
+IMPORT_SCRIPT = """
+import sys
+import streamlit
+sys.path.insert(0, {web_dir!r})
+for name in {modules!r}:
+    __import__(name)
+"""
+
+RENDER_SCRIPT = """
+import json, os, sys, time
+sys.path.insert(0, {bench_dir!r})
+import fake_upstream
+upstream = fake_upstream.start(items={items!r})
+os.environ.update(upstream.env())
+from streamlit.testing.v1 import AppTest
+ready = time.perf_counter()
+at = AppTest.from_file({path!r}, default_timeout=60)
+at.run()
+print(json.dumps({{"first_render": time.perf_counter() - ready, "error": bool(at.exception)}}))
+"""
+
+
+def child_env(scratch):
+    env = dict(os.environ)
+    env["GAG_DATA_DIR"] = os.path.join(scratch, "data")
+    env["GAG_CACHE_DIR"] = os.path.join(scratch, "cache")
+    env["GAG_MIRROR_PORT"] = "0"
+    return env
+
+
+def seed_image_cache(env):
+    # Stay offline: put a thumbnail for every fake item in the on-disk image
+    # cache the child processes will read
+    os.environ.update(env)
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, WEB_DIR)
+    import fake_upstream
+    import image_cache
+    from catalog import get_item
+
+    os.makedirs(image_cache.IMAGE_DIR, exist_ok=True)
+    thumbnail = image_cache.placeholder()
+    for endpoint in fake_upstream.STOCK_ORDERS:
+        for name in fake_upstream.make_names(endpoint, ITEMS):
+            with open(image_cache._cache_path(get_item(endpoint, name).image_url), "wb") as f:
+                f.write(thumbnail)
+
+
+def import_times(env):
+    # {module: (self us, cumulative us)} from -X importtime, for modules
+    # imported after streamlit
+    script = IMPORT_SCRIPT.format(web_dir=WEB_DIR, modules=APP_MODULES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script], env=env, capture_output=True, text=True, check=True)
+    times = {}
+    seen_streamlit = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue
+        if name == "streamlit":
+            seen_streamlit = True
+            continue
+        if seen_streamlit:
+            times[name] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def first_render(env, page):
+    script = RENDER_SCRIPT.format(bench_dir=BENCH_DIR, items=ITEMS, path=os.path.join(WEB_DIR, page))
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold start import time and time to first render")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if Welcome.py's first render is slower")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="gag-startup-")
+    env = child_env(scratch)
+    seed_image_cache(env)
+
+    runs = [import_times(env) for _ in range(args.repeat)]
+    names = set.intersection(*(set(run) for run in runs))
+    cumulative = {name: statistics.median(run[name][1] for run in runs) for name in names}
+    top_level = [name for name in APP_MODULES if name in cumulative]
+
+    print("App imports after streamlit (median cumulative ms)")
+    for name in top_level:
+        print(f"  {name:<46} {cumulative[name] / 1000:>8.1f}")
+    print("\nSlowest imports (median cumulative ms)")
+    for name in sorted(cumulative, key=cumulative.get, reverse=True)[:args.top]:
+        print(f"  {name:<46} {cumulative[name] / 1000:>8.1f}")
+
+    print(f"\n{'page':<28} {'first render (ms)':>18}")
+    welcome_ms = None
+    for page in PAGES:
+        results = [first_render(env, page) for _ in range(args.repeat)]
+        median_ms = statistics.median(r["first_render"] for r in results) * 1000
+        errors = sum(r["error"] for r in results)
+        print(f"{os.path.basename(page):<28} {median_ms:>18.1f}" + (f"  ({errors} errors)" if errors else ""))
+        if page == "Welcome.py":
+            welcome_ms = median_ms
+
+    if args.budget_ms is not None and welcome_ms > args.budget_ms:
+        print(f"\nWelcome.py first render took {welcome_ms:.0f}ms, over the {args.budget_ms:.0f}ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# Local stand-in for a Redis server, for trying the shared stock cache
+# without installing one
+#
+# Speaks enough RESP for Web/shared_cache.py: PING, AUTH, SELECT, GET, MGET,
+# SET (NX, PX, EX), DEL, INCR and MULTI/EXEC. Everything lives in memory.
+#
+#   python benchmarks/fake_redis.py [--port 6390]
+#
+#   GAG_SHARED_CACHE=redis://127.0.0.1:6390 streamlit run Web/Welcome.py
+
+import argparse
+import socketserver
+import threading
+import time
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, RedisHandler)
+        self.lock = threading.Lock()
+        # key -> (value bytes, expires_at monotonic or None)
+        self.data = {}
+        self.commands = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}"
+
+    def _get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            return None
+        if value[1] is not None and value[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return value[0]
+
+    def run(self, args):
+        # One command, under the server lock. Returns the reply value or an
+        # Exception for an error reply.
+        name = args[0].upper()
+        self.commands += 1
+        if name == b"PING":
+            return "PONG"
+        if name in (b"AUTH", b"SELECT"):
+            return "OK"
+        if name == b"GET":
+            return self._get(args[1])
+        if name == b"MGET":
+            return [self._get(key) for key in args[1:]]
+        if name == b"DEL":
+            return sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+        if name == b"INCR":
+            try:
+                value = int(self._get(args[1]) or 0) + 1
+            except ValueError:
+                return ValueError("ERR value is not an integer or out of range")
+            self.data[args[1]] = (str(value).encode(), None)
+            return value
+        if name == b"SET":
+            key, value = args[1], args[2]
+            options = [arg.upper() for arg in args[3:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.monotonic() + int(options[options.index(b"EX") + 1])
+            if b"NX" in options and self._get(key) is not None:
+                return None
+            self.data[key] = (value, expires_at)
+            return "OK"
+        return ValueError(f"ERR unknown command '{name.decode()}'")
+
+
+class RedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        queued = None
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            server = self.server
+            if name == b"MULTI":
+                queued = []
+                self._reply("OK")
+            elif name == b"EXEC":
+                with server.lock:
+                    replies = [server.run(command) for command in queued or ()]
+                queued = None
+                self._reply(replies)
+            elif queued is not None:
+                queued.append(args)
+                self._reply("QUEUED")
+            else:
+                with server.lock:
+                    reply = server.run(args)
+                self._reply(reply)
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line.startswith(b"*"):
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _encode(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, Exception):
+            return f"-{value}\r\n".encode()
+        if isinstance(value, str):
+            return f"+{value}\r\n".encode()
+        if isinstance(value, int):
+            return f":{value}\r\n".encode()
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(self._encode(item) for item in value)
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _reply(self, value):
+        self.wfile.write(self._encode(value))
+
+
+def start(host="127.0.0.1", port=0):
+    # Serve from a daemon thread; port 0 picks a free port
+    server = RedisStandIn((host, port))
+    threading.Thread(target=server.serve_forever, name="fake-redis", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a minimal in-memory Redis stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = RedisStandIn((args.host, args.port))
+    print(f"Fake Redis on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
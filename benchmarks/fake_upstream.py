@@ -0,0 +1,191 @@
+# Local stand-in for the Grow a Garden stock and weather APIs
+#
+# Serves synthetic or recorded payloads with configurable latency, errors and
+# item counts, and counts every request, so benchmarks never touch the real
+# onrender/vercel APIs.
+#
+#   python benchmarks/fake_upstream.py [--port 8600] [--items 40] [--latency 0.2]
+#       [--jitter 0.1] [--error-rate 0.05] [--shape list|wrapped] [--recorded Web/.data/last_good]
+#
+# Point the app at it with
+#
+#   GAG_API_BASE=http://127.0.0.1:8600 GAG_WEATHER_URL=http://127.0.0.1:8600/api/weather \
+#       streamlit run Web/Welcome.py
+#
+# GET /_stats returns the request count per endpoint.
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Web"))
+
+from order import COSMETIC_ORDER, EGG_ORDER, GEAR_ORDER, SEED_ORDER  # noqa: E402
+
+STOCK_ORDERS = {
+    "seeds": SEED_ORDER,
+    "eggs": EGG_ORDER,
+    "gear": GEAR_ORDER,
+    "cosmetics": COSMETIC_ORDER,
+}
+
+WEATHER_PATH = "api/weather"
+STATS_PATH = "_stats"
+
+
+def make_names(endpoint, count):
+    # Real names first, then synthetic ones once the real list runs out
+    order = STOCK_ORDERS[endpoint]
+    return [order[i] if i < len(order) else f"Synthetic {endpoint} {i}" for i in range(count)]
+
+
+def make_stock(endpoint, count, seed=0):
+    rng = random.Random(f"{endpoint}-{seed}")
+    return [{"name": name, "quantity": rng.randint(1, 20)} for name in make_names(endpoint, count)]
+
+
+def make_weather():
+    return {
+        "currentWeather": "Rain",
+        "icon": "🌧️",
+        "description": "Synthetic weather from the fake upstream",
+        "cropBonuses": "Wet",
+        "rarity": "Common",
+        "last_updated": "never",
+        "mutations": ["Wet"],
+    }
+
+
+def load_recorded(directory):
+    # <endpoint>.json files, either raw responses or Web/.data/last_good files
+    payloads = {}
+    for endpoint in (*STOCK_ORDERS, "weather"):
+        path = os.path.join(directory, f"{endpoint}.json")
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        payloads[endpoint] = saved["payload"] if isinstance(saved, dict) and "saved_at" in saved else saved
+    return payloads
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        path = urlsplit(self.path).path.strip("/")
+        if path == STATS_PATH:
+            self._send(200, json.dumps(server.request_counts()).encode("utf-8"))
+            return
+
+        endpoint = "weather" if path == WEATHER_PATH else path
+        body = server.bodies.get(endpoint)
+        if body is None:
+            self._send(404, b'{"error": "not found"}')
+            return
+
+        with server.lock:
+            server.requests[endpoint] = server.requests.get(endpoint, 0) + 1
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(503, b'{"error": "injected failure"}')
+            return
+        self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeUpstream(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, items=40, latency=0.0, jitter=0.0, error_rate=0.0, shape="list", recorded=None, seed=0):
+        super().__init__(address, FakeUpstreamHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.requests = {}
+
+        payloads = {endpoint: make_stock(endpoint, items, seed) for endpoint in STOCK_ORDERS}
+        payloads["weather"] = make_weather()
+        if recorded:
+            payloads.update(load_recorded(recorded))
+        if shape == "wrapped":
+            # The {"seeds": [...]} form some API versions return
+            payloads.update((endpoint, {endpoint: payloads[endpoint]}) for endpoint in STOCK_ORDERS)
+        self.payloads = payloads
+        self.bodies = {endpoint: json.dumps(payload).encode("utf-8") for endpoint, payload in payloads.items()}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        # Environment that points stock_api at this server
+        return {"GAG_API_BASE": self.base_url, "GAG_WEATHER_URL": f"{self.base_url}/{WEATHER_PATH}"}
+
+    def request_counts(self):
+        with self.lock:
+            return dict(self.requests)
+
+    def total_requests(self):
+        return sum(self.request_counts().values())
+
+
+def start(host="127.0.0.1", port=0, **options):
+    # Serve from a daemon thread; port 0 picks a free port
+    server = FakeUpstream((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="fake-upstream", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake Grow a Garden stock and weather")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--items", type=int, default=40, help="items per stock endpoint")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--shape", choices=("list", "wrapped"), default="list")
+    parser.add_argument("--recorded", help="directory of recorded <endpoint>.json payloads")
+    args = parser.parse_args()
+
+    server = FakeUpstream(
+        (args.host, args.port),
+        items=args.items,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        shape=args.shape,
+        recorded=args.recorded,
+    )
+    print(f"Fake upstream on {server.base_url}")
+    for name, value in server.env().items():
+        print(f"  {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()